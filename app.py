@@ -66,14 +66,8 @@ def api_stock_list():
         # 只从缓存获取样本股票的实时行情（不调用API，保证快速响应）
         spot_data_dict = {}
         if hasattr(fetcher, 'cache') and fetcher.cache:
-            for code in sample_codes:
-                # 先尝试获取1小时内的缓存
-                cached_data = fetcher.cache.get_spot_data(code, max_age_hours=1)
-                # 如果没有或过期，尝试获取更长时间的缓存（24小时）
-                if cached_data is None:
-                    cached_data = fetcher.cache.get_spot_data(code, max_age_hours=24)
-                if cached_data is not None:
-                    spot_data_dict[code] = cached_data
+            # 每只股票只有一条缓存行情，24小时内的缓存一次批量取出（已包含1小时内的）
+            spot_data_dict = fetcher.cache.get_spot_data_batch(sample_codes, max_age_hours=24)
         
         # 统计涨跌（基于样本）- 所有样本股票都计入
         up_count = 0
@@ -130,18 +124,16 @@ def api_stock_list():
         stocks = stocks.head(50)
         codes = stocks['code'].tolist()
         
-        # 为显示的股票获取实时行情（也只使用缓存）
+        # 为显示的股票获取实时行情（也只使用缓存，一次批量查询）
+        display_spots = {}
+        if hasattr(fetcher, 'cache') and fetcher.cache:
+            display_spots = fetcher.cache.get_spot_data_batch(codes, max_age_hours=24)
+        
         stock_list = []
-        for _, row in stocks.iterrows():
-            code = row['code']
-            # 从缓存中获取该股票的实时行情
-            spot = {}
-            if hasattr(fetcher, 'cache') and fetcher.cache:
-                # 先尝试获取1小时内的缓存
-                spot = fetcher.cache.get_spot_data(code, max_age_hours=1) or {}
-                # 如果没有或过期，尝试获取更长时间的缓存（24小时）
-                if not spot:
-                    spot = fetcher.cache.get_spot_data(code, max_age_hours=24) or {}
+        for code, name, status, market in zip(
+            codes, stocks['name'].tolist(), stocks['status'].tolist(), stocks['market'].tolist()
+        ):
+            spot = display_spots.get(code, {})
             
             price = 0
             change_pct = 0
@@ -156,9 +148,9 @@ def api_stock_list():
             
             stock_data = {
                 'code': code,
-                'name': row['name'],
-                'status': row['status'],
-                'market': row['market'],
+                'name': name,
+                'status': status,
+                'market': market,
                 'price': price,
                 'change_pct': change_pct
             }
@@ -234,9 +226,12 @@ def api_stock_info(code):
         
         # 最近5天数据
         recent = df.tail(5)[['close', 'open', 'high', 'low', 'volume', 'pct_change']]
-        recent_dict = recent.reset_index().to_dict(orient='records')
-        for item in recent_dict:
-            item['date'] = item['date'].strftime('%Y-%m-%d') if hasattr(item['date'], 'strftime') else str(item['date'])
+        # 日期整列格式化后再转字典
+        recent.index = pd.DatetimeIndex(recent.index).strftime('%Y-%m-%d')
+        recent_dict = recent.rename_axis('date').reset_index().to_dict(orient='records')
+        
+        # 30日统计一次agg完成，5日涨跌幅直接取最近5天数据
+        agg = df.agg({'high': 'max', 'low': 'min', 'volume': 'mean'})
         
         return jsonify({
             'success': True,
@@ -244,10 +239,10 @@ def api_stock_info(code):
             'spot': spot,
             'recent_data': recent_dict,
             'stats': {
-                'max_30d': float(df['high'].max()),
-                'min_30d': float(df['low'].min()),
-                'avg_volume': float(df['volume'].mean()),
-                'total_change_5d': float(df['pct_change'].tail(5).sum())
+                'max_30d': float(agg['high']),
+                'min_30d': float(agg['low']),
+                'avg_volume': float(agg['volume']),
+                'total_change_5d': float(recent['pct_change'].sum())
             }
         })
     except Exception as e:
@@ -265,16 +260,9 @@ def api_technical_analysis(code):
             return jsonify({'success': False, 'error': '未找到股票数据'})
         
         analyzer = TechnicalAnalyzer(df)
+        # 最新信号已是Python原生类型，可直接序列化
         signals = analyzer.get_latest_signals()
         
-        # 转换numpy类型为Python类型
-        def convert_value(v):
-            if hasattr(v, 'item'):
-                return v.item()
-            return v
-        
-        signals = {k: convert_value(v) for k, v in signals.items()}
-        
         return jsonify({
             'success': True,
             'code': code,
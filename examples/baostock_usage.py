@@ -4,6 +4,7 @@
 """
 import sys
 import os
+import functools
 
 # 添加项目根目录到路径
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -11,13 +12,18 @@ sys.path.insert(0, project_root)
 
 from src import BaoStockDataFetcher, TechnicalAnalyzer, StockVisualizer
 
+@functools.lru_cache(maxsize=1)
+def get_fetcher() -> BaoStockDataFetcher:
+    """各示例共用一个数据获取器，复用登录和进程内缓存"""
+    return BaoStockDataFetcher()
+
 def example1_get_stock_list():
     """示例1: 获取股票列表"""
     print("=" * 60)
     print("示例1: 获取A股股票列表")
     print("=" * 60)
     
-    fetcher = BaoStockDataFetcher()
+    fetcher = get_fetcher()
     stocks = fetcher.get_stock_list()
     
     print(f"\n共获取 {len(stocks)} 只股票")
@@ -34,7 +40,7 @@ def example2_get_historical_data():
     print("示例2: 获取平安银行(000001)历史数据")
     print("=" * 60)
     
-    fetcher = BaoStockDataFetcher()
+    fetcher = get_fetcher()
     df = fetcher.get_historical_data("000001", days=60)
     
     print(f"\n获取 {len(df)} 条历史数据")
@@ -54,7 +60,7 @@ def example3_technical_analysis():
     print("示例3: 技术分析")
     print("=" * 60)
     
-    fetcher = BaoStockDataFetcher()
+    fetcher = get_fetcher()
     df = fetcher.get_historical_data("000001", days=60)
     
     analyzer = TechnicalAnalyzer(df)
@@ -76,7 +82,7 @@ def example4_multiple_stocks():
     print("示例4: 多只股票对比")
     print("=" * 60)
     
-    fetcher = BaoStockDataFetcher()
+    fetcher = get_fetcher()
     
     stocks = [
         ("000001", "平安银行"),
@@ -89,9 +95,13 @@ def example4_multiple_stocks():
     print(f"{'代码':<10} {'名称':<10} {'最新价':>10} {'涨跌幅':>10}")
     print("-" * 45)
     
+    # 一次批量预取所有股票的历史数据
+    history = fetcher.get_historical_data_batch([code for code, _ in stocks], days=30)
+    groups = dict(tuple(history.groupby('code', sort=False))) if not history.empty else {}
+    
     for code, name in stocks:
-        df = fetcher.get_historical_data(code, days=30)
-        if not df.empty:
+        df = groups.get(code)
+        if df is not None:
             latest_price = df['close'].iloc[-1]
             total_change = df['pct_change'].sum()
             print(f"{code:<10} {name:<10} {latest_price:>10.2f} {total_change:>10.2f}%")
@@ -102,14 +112,16 @@ def example5_screening():
     print("示例5: 简单选股 - 查找近期涨幅较大的股票")
     print("=" * 60)
     
-    fetcher = BaoStockDataFetcher()
+    fetcher = get_fetcher()
     
     # 获取一些热门股票
     test_codes = ["000001", "000002", "000858", "600000", "600036", "600519", "000858"]
     
+    # 线程池批量获取，重复代码只取一次
+    history = fetcher.get_historical_data_batch(list(dict.fromkeys(test_codes)), days=20)
+    
     results = []
-    for code in test_codes:
-        df = fetcher.get_historical_data(code, days=20)
+    for code, df in (history.groupby('code', sort=False) if not history.empty else []):
         if not df.empty:
             latest_price = df['close'].iloc[-1]
             total_change = df['pct_change'].sum()
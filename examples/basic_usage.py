@@ -3,6 +3,7 @@
 """
 
 import sys
+from concurrent.futures import ThreadPoolExecutor
 sys.path.insert(0, '..')
 
 from src import (
@@ -150,9 +151,12 @@ def example_5_multi_stock_analysis():
     print("\n分析多只股票:")
     print("-" * 40)
     
+    # 各股票的请求互不依赖，用线程池并发获取
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        frames = list(executor.map(lambda c: fetcher.get_historical_data(c, days=30), codes))
+    
     results = []
-    for code in codes:
-        df = fetcher.get_historical_data(code, days=30)
+    for code, df in zip(codes, frames):
         if not df.empty:
             analyzer = TechnicalAnalyzer(df)
             signals = analyzer.get_latest_signals()
@@ -166,7 +170,7 @@ def example_5_multi_stock_analysis():
     
     import pandas as pd
     comparison = pd.DataFrame(results)
-    print(comparison)
+    print(comparison.to_string(max_rows=20))
 
 
 def main():
@@ -1,3 +1,4 @@
+import os
 from src.baostock_fetcher import BaoStockDataFetcher
 from src.cache import StockDataCache
 
@@ -13,4 +14,8 @@ print(f"  总股票数: {len(stocks)}")
 print(f"  状态分布:")
 print(stocks['status'].value_counts())
 
+# 调试时设置 VERBOSE=1 查看列表样例，最多格式化20行，避免整表转字符串
+if os.getenv('VERBOSE'):
+    print(stocks.to_string(max_rows=20))
+
 print(f"\n已更新股票列表到缓存")
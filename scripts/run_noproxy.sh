@@ -0,0 +1,4 @@
+#!/bin/sh
+# 去掉代理环境变量后执行命令，例如: scripts/run_noproxy.sh python app.py
+exec env -u HTTP_PROXY -u HTTPS_PROXY -u http_proxy -u https_proxy \
+    -u ALL_PROXY -u all_proxy -u NO_PROXY -u no_proxy "$@"
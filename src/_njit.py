@@ -0,0 +1,18 @@
+"""
+numba 可选依赖 - 未安装 numba 时 njit 退化为普通 Python 函数
+"""
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """numba.njit 的占位实现，原样返回被装饰的函数"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
@@ -1,14 +1,39 @@
 """
 股票数据获取模块 - 使用baostock获取A股数据（带缓存）
 """
+import re
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import baostock as bs
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, List
 from .cache import StockDataCache
 from . import baostock_global
 
 
+# A股股票代码前缀（排除指数），各板块含义见 get_stock_list
+_A_SHARE_CODE_RE = re.compile(r'(?:sh\.(?:60|688)|sz\.(?:000|001|300))')
+
+
+def _collect_rows(rs) -> List[list]:
+    """
+    取出 baostock 查询结果的全部行
+    
+    按页整体拷贝已返回的数据，代替逐行 next()/get_row_data()；
+    翻页请求仍由 rs.next() 完成，与查询共用同一socket，因此在 query_lock 内进行
+    """
+    rows = []
+    with baostock_global.query_lock:
+        while (rs.error_code == '0') & rs.next():
+            rows.extend(rs.data[rs.cur_row_num:])
+            rs.cur_row_num = len(rs.data)
+    return rows
+
+
 class BaoStockDataFetcher:
     """A股数据获取器 - 使用baostock（带缓存）"""
     
@@ -23,6 +48,18 @@ class BaoStockDataFetcher:
         self.enable_cache = enable_cache
         self.cache = StockDataCache(cache_path) if enable_cache else None
         self.lg = None
+        
+        # 进程内历史数据LRU缓存，同一会话内重复请求不再访问数据库/网络
+        # 条目有效期与数据库历史数据缓存一致（秒）
+        self.memo_size = 256
+        self.memo_ttl = 24 * 3600
+        self._history_memo = OrderedDict()  # key -> (写入时间, DataFrame)
+        self._memo_lock = threading.Lock()
+        
+        # 股票列表的进程内缓存（有效期秒），避免重复读库和解析
+        self.stock_list_ttl = 600
+        self._stock_list_memo = None  # (获取时间, DataFrame)
+        
         self._login()
     
     def _login(self):
@@ -50,13 +87,31 @@ class BaoStockDataFetcher:
         """手动关闭连接"""
         self._logout()
     
-    def get_stock_list(self) -> pd.DataFrame:
+    def get_stock_list(self, use_memo: bool = True) -> pd.DataFrame:
         """
         获取A股所有股票列表（带缓存）
         
+        先查进程内缓存（stock_list_ttl 秒内有效），再查数据库缓存，最后请求API
+        
+        Args:
+            use_memo: 是否使用进程内缓存；同步任务传False，确保重新读取数据库/API
+        
         Returns:
             DataFrame包含: code, name等信息
         """
+        with self._memo_lock:
+            memo = self._stock_list_memo
+        if use_memo and memo is not None and time.monotonic() - memo[0] < self.stock_list_ttl:
+            return memo[1].copy()
+        
+        stocks = self._load_stock_list()
+        if not stocks.empty:
+            with self._memo_lock:
+                self._stock_list_memo = (time.monotonic(), stocks.copy())
+        return stocks
+    
+    def _load_stock_list(self) -> pd.DataFrame:
+        """从数据库缓存或API获取股票列表"""
         try:
             # 尝试从缓存获取
             if self.enable_cache and self.cache:
@@ -66,7 +121,9 @@ class BaoStockDataFetcher:
                     return cached_data
             
             # 尝试获取股票列表，使用多个日期策略
-            dates_to_try = []
+            # 策略0: 一次查询交易日历，从最近的交易日开始尝试
+            dates_to_try = self._recent_trading_days()
+            calendar_ok = bool(dates_to_try)
             
             # 策略1: 使用已知的历史交易日（baostock数据通常有延迟）
             # 使用2024年底和2025年初的日期
@@ -77,23 +134,23 @@ class BaoStockDataFetcher:
                 '2025-01-06', '2025-01-03', '2025-01-02', '2024-12-31', '2024-12-30',
                 '2024-12-27', '2024-12-26', '2024-12-25', '2024-12-24', '2024-12-23'
             ]
-            dates_to_try.extend(known_trading_dates)
+            dates_to_try.extend(d for d in known_trading_dates if d not in dates_to_try)
             
-            # 策略2: 从今天开始往前找最近的60天（作为后备）
-            for i in range(60):
-                date = (datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d')
-                if date not in dates_to_try:
-                    dates_to_try.append(date)
+            # 策略2: 交易日历查询失败时，从今天开始往前找最近的60天（作为后备）
+            if not calendar_ok:
+                for i in range(60):
+                    date = (datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d')
+                    if date not in dates_to_try:
+                        dates_to_try.append(date)
             
             for date in dates_to_try:
-                rs = bs.query_all_stock(day=date)
+                with baostock_global.query_lock:
+                    rs = bs.query_all_stock(day=date)
                 
                 if rs.error_code != '0':
                     continue
                 
-                data_list = []
-                while (rs.error_code == '0') & rs.next():
-                    data_list.append(rs.get_row_data())
+                data_list = _collect_rows(rs)
                 
                 result = pd.DataFrame(data_list, columns=rs.fields)
                 
@@ -102,13 +159,7 @@ class BaoStockDataFetcher:
                 # 上海科创板: sh.688000-688999
                 # 深圳主板: sz.000xxx, sz.001xxx
                 # 深圳创业板: sz.300xxx
-                a_stocks = result[
-                    (result['code'].str.startswith('sh.60')) |  # 上海主板
-                    (result['code'].str.startswith('sh.688')) |  # 上海科创板
-                    (result['code'].str.startswith('sz.000')) |  # 深圳主板
-                    (result['code'].str.startswith('sz.001')) |  # 深圳主板
-                    (result['code'].str.startswith('sz.300'))    # 深圳创业板
-                ].copy()
+                a_stocks = result[result['code'].str.match(_A_SHARE_CODE_RE)].copy()
                 
                 # 如果没有A股股票，继续尝试下一个日期
                 if len(a_stocks) == 0:
@@ -159,6 +210,33 @@ class BaoStockDataFetcher:
             traceback.print_exc()
             return pd.DataFrame()
     
+    def _recent_trading_days(self, days: int = 30) -> List[str]:
+        """
+        查询最近的交易日（一次请求交易日历）
+        
+        Args:
+            days: 向前查询的自然日天数
+            
+        Returns:
+            交易日列表，最近的在前；查询失败时为空列表
+        """
+        try:
+            end_date = datetime.now()
+            start_date = end_date - timedelta(days=days)
+            with baostock_global.query_lock:
+                rs = bs.query_trade_dates(
+                    start_date=start_date.strftime('%Y-%m-%d'),
+                    end_date=end_date.strftime('%Y-%m-%d')
+                )
+            if rs.error_code != '0':
+                return []
+            
+            trading_days = [row[0] for row in _collect_rows(rs) if row[1] == '1']
+            return trading_days[::-1]
+        except Exception as e:
+            print(f"查询交易日历失败: {e}")
+            return []
+    
     def get_stock_spot(self, code: str) -> dict:
         """
         获取单只股票的实时行情（带缓存）
@@ -193,21 +271,20 @@ class BaoStockDataFetcher:
             # 从今天开始往前查找最近的交易日
             for i in range(30):
                 date = (datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d')
-                rs = bs.query_history_k_data_plus(
-                    code,
-                    "date,code,open,high,low,close,volume,amount,pctChg,turn",
-                    start_date=date,
-                    end_date=date,
-                    frequency="d",
-                    adjustflag="3"
-                )
+                with baostock_global.query_lock:
+                    rs = bs.query_history_k_data_plus(
+                        code,
+                        "date,code,open,high,low,close,volume,amount,pctChg,turn",
+                        start_date=date,
+                        end_date=date,
+                        frequency="d",
+                        adjustflag="3"
+                    )
                 
                 if rs.error_code != '0':
                     continue
                 
-                data_list = []
-                while (rs.error_code == '0') & rs.next():
-                    data_list.append(rs.get_row_data())
+                data_list = _collect_rows(rs)
                 
                 if data_list:
                     result = pd.DataFrame(data_list, columns=rs.fields)
@@ -276,11 +353,8 @@ class BaoStockDataFetcher:
             # 步骤1: 批量获取缓存中有效的数据
             cache_hits = 0
             if self.enable_cache and self.cache:
-                for code in codes:
-                    cached_data = self.cache.get_spot_data(code, max_age_hours=1)
-                    if cached_data is not None:
-                        result[code] = cached_data
-                        cache_hits += 1
+                result.update(self.cache.get_spot_data_batch(list(codes), max_age_hours=1))
+                cache_hits = len(result)
             
             # 步骤2: 找出需要从API获取的股票
             codes_need_fetch = [code for code in codes if code not in result]
@@ -301,19 +375,18 @@ class BaoStockDataFetcher:
                     date = (datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d')
                     
                     try:
-                        rs = bs.query_history_k_data_plus(
-                            test_code,
-                            "date",
-                            start_date=date,
-                            end_date=date,
-                            frequency="d",
-                            adjustflag="3"
-                        )
+                        with baostock_global.query_lock:
+                            rs = bs.query_history_k_data_plus(
+                                test_code,
+                                "date",
+                                start_date=date,
+                                end_date=date,
+                                frequency="d",
+                                adjustflag="3"
+                            )
                         
                         if rs.error_code == '0':
-                            data_list = []
-                            while (rs.error_code == '0') & rs.next():
-                                data_list.append(rs.get_row_data())
+                            data_list = _collect_rows(rs)
                             if data_list:
                                 trading_date = date
                                 print(f"找到最近交易日: {trading_date} (使用测试码 {test_code})")
@@ -332,7 +405,7 @@ class BaoStockDataFetcher:
             # 步骤4: 批量获取所有股票数据，添加延迟避免请求过快
             success_count = 0
             total_count = len(codes_need_fetch)
-            batch_start_time = time.time()
+            batch_start_time = time.perf_counter()
             
             # 连接错误计数器
             connection_errors = 0
@@ -351,14 +424,15 @@ class BaoStockDataFetcher:
                         code_with_prefix = f'sz.{code}'
                 
                 try:
-                    rs = bs.query_history_k_data_plus(
-                        code_with_prefix,
-                        "date,code,open,high,low,close,volume,amount,pctChg,turn",
-                        start_date=trading_date,
-                        end_date=trading_date,
-                        frequency="d",
-                        adjustflag="3"
-                    )
+                    with baostock_global.query_lock:
+                        rs = bs.query_history_k_data_plus(
+                            code_with_prefix,
+                            "date,code,open,high,low,close,volume,amount,pctChg,turn",
+                            start_date=trading_date,
+                            end_date=trading_date,
+                            frequency="d",
+                            adjustflag="3"
+                        )
                     
                     if rs.error_code != '0':
                         # 检查是否是连接错误
@@ -380,9 +454,7 @@ class BaoStockDataFetcher:
                             print(f"API错误 {code}: {rs.error_msg}")
                         continue
                     
-                    data_list = []
-                    while (rs.error_code == '0') & rs.next():
-                        data_list.append(rs.get_row_data())
+                    data_list = _collect_rows(rs)
                     
                     if data_list:
                         df = pd.DataFrame(data_list, columns=rs.fields)
@@ -434,7 +506,7 @@ class BaoStockDataFetcher:
                 
                 # 每100只股票显示一次进度和预估时间
                 if (idx + 1) % 100 == 0:
-                    elapsed = time.time() - batch_start_time
+                    elapsed = time.perf_counter() - batch_start_time
                     rate = (idx + 1) / elapsed if elapsed > 0 else 0
                     remaining = (total_count - idx - 1) / rate if rate > 0 else 0
                     print(f"进度: {idx + 1}/{total_count} ({(idx + 1) / total_count * 100:.1f}%), "
@@ -449,7 +521,7 @@ class BaoStockDataFetcher:
                 if (idx + 1) % 5 == 0:  # 每5只股票延迟一次
                     time.sleep(base_delay)
             
-            elapsed_total = time.time() - batch_start_time
+            elapsed_total = time.perf_counter() - batch_start_time
             success_rate = success_count / total_count * 100 if total_count > 0 else 0
             avg_speed = total_count / elapsed_total if elapsed_total > 0 else 0
             
@@ -511,14 +583,15 @@ class BaoStockDataFetcher:
                             continue
                     
                     try:
-                        rs = bs.query_history_k_data_plus(
-                            code_with_prefix,
-                            "date,code,open,high,low,close,volume,amount,pctChg",
-                            start_date=date,
-                            end_date=date,
-                            frequency="d",
-                            adjustflag="3"
-                        )
+                        with baostock_global.query_lock:
+                            rs = bs.query_history_k_data_plus(
+                                code_with_prefix,
+                                "date,code,open,high,low,close,volume,amount,pctChg",
+                                start_date=date,
+                                end_date=date,
+                                frequency="d",
+                                adjustflag="3"
+                            )
                     except Exception as e:
                         print(f"获取指数 {code} 数据时出错: {e}")
                         continue
@@ -527,9 +600,7 @@ class BaoStockDataFetcher:
                         continue
                     
                     try:
-                        data_list = []
-                        while (rs.error_code == '0') & rs.next():
-                            data_list.append(rs.get_row_data())
+                        data_list = _collect_rows(rs)
                     except Exception as e:
                         print(f"解析指数 {code} 数据时出错: {e}")
                         continue
@@ -601,6 +672,12 @@ class BaoStockDataFetcher:
                 if start_date is None:
                     start_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
                 
+                # 尝试从进程内缓存获取
+                memo_key = (code, period, start_date, end_date, adjust)
+                memo_data = self._memo_get(memo_key)
+                if memo_data is not None:
+                    return memo_data
+                
                 # 尝试从缓存获取
                 if self.enable_cache and self.cache:
                     cached_data = self.cache.get_historical_data(
@@ -608,6 +685,7 @@ class BaoStockDataFetcher:
                     )
                     if cached_data is not None:
                         print(f"从缓存获取股票 {code} 历史数据，共 {len(cached_data)} 条")
+                        self._memo_put(memo_key, cached_data)
                         return cached_data
                 
                 # 设置复权标志
@@ -626,23 +704,22 @@ class BaoStockDataFetcher:
                 }
                 frequency = frequency_map.get(period, 'd')
                 
-                # 获取数据
-                rs = bs.query_history_k_data_plus(
-                    code,
-                    "date,code,open,high,low,close,volume,amount,pctChg,turn",
-                    start_date=start_date,
-                    end_date=end_date,
-                    frequency=frequency,
-                    adjustflag=adjustflag
-                )
-                
-                if rs.error_code != '0':
-                    print(f"获取股票 {code} 历史数据失败: {rs.error_msg}")
-                    return pd.DataFrame()
-                
-                data_list = []
-                while (rs.error_code == '0') & rs.next():
-                    data_list.append(rs.get_row_data())
+                # 获取数据（baostock共用一个socket，查询和翻页需加锁）
+                with baostock_global.query_lock:
+                    rs = bs.query_history_k_data_plus(
+                        code,
+                        "date,code,open,high,low,close,volume,amount,pctChg,turn",
+                        start_date=start_date,
+                        end_date=end_date,
+                        frequency=frequency,
+                        adjustflag=adjustflag
+                    )
+                    
+                    if rs.error_code != '0':
+                        print(f"获取股票 {code} 历史数据失败: {rs.error_msg}")
+                        return pd.DataFrame()
+                    
+                    data_list = _collect_rows(rs)
                 
                 if not data_list:
                     return pd.DataFrame()
@@ -667,6 +744,7 @@ class BaoStockDataFetcher:
                     self.cache.save_historical_data(code, result)
                     print(f"已保存股票 {code} 历史数据到缓存，共 {len(result)} 条")
                 
+                self._memo_put(memo_key, result)
                 return result
                 
             except Exception as e:
@@ -694,6 +772,118 @@ class BaoStockDataFetcher:
         print(f"获取股票 {code} 历史数据失败，已重试 {max_retries} 次: {last_error}")
         return pd.DataFrame()
     
+    def _memo_get(self, key: tuple) -> Optional[pd.DataFrame]:
+        """从进程内LRU缓存读取历史数据"""
+        with self._memo_lock:
+            entry = self._history_memo.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] >= self.memo_ttl:
+                del self._history_memo[key]
+                return None
+            self._history_memo.move_to_end(key)
+        return entry[1].copy()
+    
+    def _memo_put(self, key: tuple, df: pd.DataFrame):
+        """写入进程内LRU缓存"""
+        if df.empty:
+            return
+        with self._memo_lock:
+            self._history_memo[key] = (time.monotonic(), df.copy())
+            self._history_memo.move_to_end(key)
+            while len(self._history_memo) > self.memo_size:
+                self._history_memo.popitem(last=False)
+    
+    def get_historical_data_batch(
+        self,
+        codes: List[str],
+        days: Optional[int] = None,
+        request_delay: float = 0.0,
+        max_workers: int = 8,
+        **kwargs
+    ) -> pd.DataFrame:
+        """
+        批量获取多只股票历史K线数据
+        
+        baostock 不支持一次查询多只股票，这里用线程池逐只获取（优先走缓存），
+        再合并为一张带 code 列的长表，方便调用方按 code 分组做向量化计算。
+        网络查询在 baostock_global.query_lock 内串行执行，并发主要节省
+        缓存读取和数据解析的时间
+        
+        Args:
+            codes: 股票代码列表
+            days: 获取天数
+            request_delay: 每次请求之后的间隔（秒）
+            max_workers: 线程数
+            **kwargs: 其他参数，透传给 get_historical_data
+            
+        Returns:
+            DataFrame，以date为索引，code列为传入的股票代码
+        """
+        def fetch_one(code):
+            df = self.get_historical_data(code, days=days, **kwargs)
+            if request_delay:
+                time.sleep(request_delay)
+            return df.assign(code=code) if not df.empty else None
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            frames = [df for df in executor.map(fetch_one, codes) if df is not None]
+        
+        if not frames:
+            return pd.DataFrame()
+        
+        return pd.concat(frames)
+    
+    def get_latest_features(
+        self,
+        codes: List[str],
+        days: Optional[int] = 30,
+        window: int = 20,
+        request_delay: float = 0.0,
+        max_workers: int = 8
+    ) -> pd.DataFrame:
+        """
+        批量获取多只股票最新一天的行情特征
+        
+        每只股票只保留最后一天的收盘价、成交量、涨跌幅和成交量均线，
+        不合并完整历史，适合只看最新值的筛选
+        
+        Args:
+            codes: 股票代码列表
+            days: 获取天数
+            window: 成交量均线周期
+            request_delay: 每次请求之后的间隔（秒）
+            max_workers: 线程数
+            
+        Returns:
+            DataFrame包含: code, close, volume, pct_change, vol_ma{window}
+        """
+        vol_ma_col = f'vol_ma{window}'
+        
+        def features_one(code):
+            df = self.get_historical_data(code, days=days)
+            if request_delay:
+                time.sleep(request_delay)
+            if df.empty:
+                return None
+            volume = df['volume'].to_numpy(dtype=np.float64)
+            vol_ma = volume[-window:].mean() if len(volume) >= window else np.nan
+            return (
+                code,
+                df['close'].iat[-1],
+                volume[-1],
+                df['pct_change'].iat[-1],
+                vol_ma
+            )
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            rows = [row for row in executor.map(features_one, codes) if row is not None]
+        
+        return pd.DataFrame(
+            rows,
+            columns=['code', 'close', 'volume', 'pct_change', vol_ma_col]
+        )
+    
     def get_index_data(self, index_code: str = "000001") -> pd.DataFrame:
         """
         获取指数数据（带缓存）
@@ -724,22 +914,21 @@ class BaoStockDataFetcher:
                     print(f"从缓存获取指数 {index_code} 数据，共 {len(cached_data)} 条")
                     return cached_data
             
-            rs = bs.query_history_k_data_plus(
-                index_code,
-                "date,code,open,high,low,close,volume,amount,pctChg",
-                start_date=start_date,
-                end_date=end_date,
-                frequency="d",
-                adjustflag="3"
-            )
+            with baostock_global.query_lock:
+                rs = bs.query_history_k_data_plus(
+                    index_code,
+                    "date,code,open,high,low,close,volume,amount,pctChg",
+                    start_date=start_date,
+                    end_date=end_date,
+                    frequency="d",
+                    adjustflag="3"
+                )
             
             if rs.error_code != '0':
                 print(f"获取指数 {index_code} 数据失败: {rs.error_msg}")
                 return pd.DataFrame()
             
-            data_list = []
-            while (rs.error_code == '0') & rs.next():
-                data_list.append(rs.get_row_data())
+            data_list = _collect_rows(rs)
             
             if not data_list:
                 return pd.DataFrame()
@@ -791,6 +980,11 @@ class BaoStockDataFetcher:
         Args:
             table: 表名（None表示清除所有）
         """
+        with self._memo_lock:
+            if table in (None, 'stock_list'):
+                self._stock_list_memo = None
+            if table in (None, 'historical_data'):
+                self._history_memo.clear()
         if self.cache:
             self.cache.clear_cache(table)
             print(f"已清除缓存: {table if table else '所有'}")
@@ -808,6 +1002,18 @@ class BaoStockDataFetcher:
 
 
 # 便捷函数
+# 便捷函数共用的数据获取器，保留其进程内缓存
+_default_fetcher: Optional[BaoStockDataFetcher] = None
+
+
+def _get_fetcher() -> BaoStockDataFetcher:
+    """获取共用的默认数据获取器"""
+    global _default_fetcher
+    if _default_fetcher is None:
+        _default_fetcher = BaoStockDataFetcher()
+    return _default_fetcher
+
+
 def fetch_stock_data(code: str, days: int = 365) -> pd.DataFrame:
     """
     快速获取股票历史数据的便捷函数
@@ -819,7 +1025,7 @@ def fetch_stock_data(code: str, days: int = 365) -> pd.DataFrame:
     Returns:
         DataFrame
     """
-    fetcher = BaoStockDataFetcher()
+    fetcher = _get_fetcher()
     start_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
     return fetcher.get_historical_data(code, start_date=start_date)
 
@@ -831,5 +1037,5 @@ def fetch_market_data() -> pd.DataFrame:
     Returns:
         DataFrame包含所有A股数据
     """
-    fetcher = BaoStockDataFetcher()
+    fetcher = _get_fetcher()
     return fetcher.get_stock_list()
@@ -9,6 +9,9 @@ _lock = threading.Lock()
 _login_count = 0
 _lg = None
 
+# baostock 所有查询共用同一个 socket，多线程并发查询时必须串行化
+query_lock = threading.RLock()
+
 
 def global_login():
     """全局登录"""
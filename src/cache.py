@@ -4,7 +4,7 @@ SQLite缓存模块 - 用于缓存股票数据
 import sqlite3
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, List, Dict
 import os
 
 
@@ -19,6 +19,8 @@ class StockDataCache:
             db_path: 数据库文件路径
         """
         self.db_path = db_path
+        # 股票列表整表存为Parquet（需要pyarrow），不可用时退回SQLite表
+        self.stock_list_path = os.path.join(os.path.dirname(db_path), 'stock_list.parquet')
         
         # 确保数据目录存在
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
@@ -26,9 +28,21 @@ class StockDataCache:
         # 初始化数据库
         self._init_db()
     
+    def _connect(self) -> sqlite3.Connection:
+        """
+        打开数据库连接并设置读取相关的PRAGMA
+        
+        内存映射读取、64MB页缓存，临时表放在内存中
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA mmap_size=268435456')
+        conn.execute('PRAGMA cache_size=-65536')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+    
     def _init_db(self):
         """初始化数据库表"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             # 股票列表缓存表
@@ -112,7 +126,11 @@ class StockDataCache:
         Returns:
             DataFrame或None（如果缓存过期或不存在）
         """
-        with sqlite3.connect(self.db_path) as conn:
+        df = self._read_stock_list_parquet(max_age_hours)
+        if df is not None:
+            return df
+        
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             # 检查缓存是否存在且未过期
@@ -141,25 +159,74 @@ class StockDataCache:
             df = pd.DataFrame(rows, columns=['code', 'name', 'status', 'market'])
             return df
     
+    def _read_stock_list_parquet(self, max_age_hours: int) -> Optional[pd.DataFrame]:
+        """读取未过期的Parquet股票列表，文件不存在、过期或无法读取时返回None"""
+        try:
+            age_seconds = datetime.now().timestamp() - os.path.getmtime(self.stock_list_path)
+        except OSError:
+            return None
+        if age_seconds > max_age_hours * 3600:
+            return None
+        
+        try:
+            df = pd.read_parquet(self.stock_list_path)
+        except Exception as e:  # 缺少pyarrow或文件损坏时退回SQLite
+            print(f"读取Parquet股票列表失败，改用SQLite缓存: {e}")
+            return None
+        return df if not df.empty else None
+    
+    def save_stock_list_parquet(self, df: pd.DataFrame) -> bool:
+        """
+        将股票列表整表写入Parquet文件
+        
+        Args:
+            df: 股票列表DataFrame
+            
+        Returns:
+            是否写入成功（未安装pyarrow时返回False）
+        """
+        # 先写临时文件再整体替换，读取方不会读到写了一半的文件
+        tmp_path = self.stock_list_path + '.tmp'
+        try:
+            df[['code', 'name', 'status', 'market']].reset_index(drop=True).to_parquet(
+                tmp_path, engine='pyarrow', compression='zstd'
+            )
+            os.replace(tmp_path, self.stock_list_path)
+            return True
+        except Exception as e:
+            if not isinstance(e, ImportError):
+                print(f"写入Parquet股票列表失败，改用SQLite缓存: {e}")
+            # 删除旧文件，否则读取时会优先返回过期的列表
+            for path in (tmp_path, self.stock_list_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            return False
+    
     def save_stock_list(self, df: pd.DataFrame):
         """
         保存股票列表到缓存
         
+        同时写入Parquet文件和SQLite表：读取时优先Parquet，
+        Parquet不可用或损坏时回退到SQLite
+        
         Args:
             df: 股票列表DataFrame
         """
-        with sqlite3.connect(self.db_path) as conn:
+        self.save_stock_list_parquet(df)
+        
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             # 清除旧数据
             cursor.execute('DELETE FROM stock_list')
             
             # 插入新数据
-            for _, row in df.iterrows():
-                cursor.execute('''
-                    INSERT INTO stock_list (code, name, status, market)
-                    VALUES (?, ?, ?, ?)
-                ''', (row['code'], row['name'], row['status'], row['market']))
+            cursor.executemany('''
+                INSERT INTO stock_list (code, name, status, market)
+                VALUES (?, ?, ?, ?)
+            ''', df[['code', 'name', 'status', 'market']].itertuples(index=False, name=None))
             
             conn.commit()
     
@@ -182,7 +249,7 @@ class StockDataCache:
         Returns:
             DataFrame或None（如果缓存过期或不存在）
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             # 检查缓存是否存在且未过期
@@ -196,30 +263,21 @@ class StockDataCache:
             if count == 0:
                 return None
             
-            # 获取缓存数据
-            cursor.execute('''
+            # 获取缓存数据（pandas 直接按列构建，日期解析为索引）
+            df = pd.read_sql_query('''
                 SELECT date, open, high, low, close, volume, amount, pct_change, turnover
                 FROM historical_data
                 WHERE code = ? AND date >= ? AND date <= ?
                 ORDER BY date ASC
-            ''', (code, start_date, end_date))
+            ''', conn, params=(code, start_date, end_date), index_col='date', parse_dates=['date'])
             
-            rows = cursor.fetchall()
-            
-            if not rows:
+            if df.empty:
                 return None
             
-            df = pd.DataFrame(rows, columns=[
-                'date', 'open', 'high', 'low', 'close',
-                'volume', 'amount', 'pct_change', 'turnover'
-            ])
-            
             # 转换数据类型
-            df['date'] = pd.to_datetime(df['date'])
             for col in ['open', 'high', 'low', 'close', 'volume', 'amount', 'pct_change', 'turnover']:
                 df[col] = pd.to_numeric(df[col], errors='coerce')
             
-            df.set_index('date', inplace=True)
             return df
     
     def save_historical_data(self, code: str, df: pd.DataFrame):
@@ -230,7 +288,7 @@ class StockDataCache:
             code: 股票代码
             df: 历史数据DataFrame
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             # 删除该股票的旧数据
@@ -262,7 +320,7 @@ class StockDataCache:
         Returns:
             dict或None（如果缓存过期或不存在）
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             cursor.execute('''
@@ -278,6 +336,74 @@ class StockDataCache:
             import json
             return json.loads(row[0])
     
+    def get_spot_data_batch(self, codes: List[str], max_age_hours: int = 1) -> Dict[str, dict]:
+        """
+        批量获取缓存的实时行情（一次连接，按批用 IN 查询）
+        
+        Args:
+            codes: 股票代码列表
+            max_age_hours: 最大缓存时间（小时）
+            
+        Returns:
+            字典，key为股票代码，value为行情数据；缓存缺失或过期的代码不在其中
+        """
+        import json
+        result = {}
+        # SQLite 单条语句的参数个数有上限，分批查询
+        batch_size = 500
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            # 分块取行，边取边解析，不一次性物化全部结果
+            cursor.arraysize = 1024
+            for i in range(0, len(codes), batch_size):
+                batch = codes[i:i + batch_size]
+                cursor.execute('''
+                    SELECT code, data FROM spot_data
+                    WHERE code IN ({}) AND updated_at > datetime('now', '-{} hours')
+                '''.format(','.join('?' * len(batch)), max_age_hours), batch)
+                while True:
+                    rows = cursor.fetchmany()
+                    if not rows:
+                        break
+                    for code, data in rows:
+                        result[code] = json.loads(data)
+        return result
+    
+    def get_missing_spot_codes(self, codes: List[str], max_age_hours: int = 1) -> List[str]:
+        """
+        找出没有有效实时行情缓存的股票代码
+        
+        代码写入临时表后与 spot_data 做一次 LEFT JOIN，差集在 SQLite 内完成
+        
+        Args:
+            codes: 股票代码列表
+            max_age_hours: 最大缓存时间（小时）
+            
+        Returns:
+            缓存缺失或过期的代码，保持传入顺序
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('CREATE TEMP TABLE IF NOT EXISTS wanted_codes (pos INTEGER PRIMARY KEY, code TEXT)')
+            cursor.execute('DELETE FROM wanted_codes')
+            cursor.executemany('INSERT INTO wanted_codes (code) VALUES (?)', ((code,) for code in codes))
+            cursor.execute('''
+                SELECT w.code FROM wanted_codes w
+                LEFT JOIN spot_data s
+                    ON s.code = w.code AND s.updated_at > datetime('now', '-{} hours')
+                WHERE s.code IS NULL
+                ORDER BY w.pos
+            '''.format(max_age_hours))
+            
+            missing = []
+            cursor.arraysize = 1024
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                missing.extend(row[0] for row in rows)
+            return missing
+    
     def save_spot_data(self, code: str, data: dict):
         """
         保存实时行情到缓存
@@ -286,7 +412,7 @@ class StockDataCache:
             code: 股票代码
             data: 实时行情数据
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             import json
@@ -316,7 +442,7 @@ class StockDataCache:
         Returns:
             DataFrame或None（如果缓存过期或不存在）
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             # 检查缓存是否存在且未过期
@@ -330,30 +456,21 @@ class StockDataCache:
             if count == 0:
                 return None
             
-            # 获取缓存数据
-            cursor.execute('''
+            # 获取缓存数据（pandas 直接按列构建，日期解析为索引）
+            df = pd.read_sql_query('''
                 SELECT date, open, high, low, close, volume, amount, pct_change
                 FROM index_data
                 WHERE code = ? AND date >= ? AND date <= ?
                 ORDER BY date ASC
-            ''', (code, start_date, end_date))
-            
-            rows = cursor.fetchall()
+            ''', conn, params=(code, start_date, end_date), index_col='date', parse_dates=['date'])
             
-            if not rows:
+            if df.empty:
                 return None
             
-            df = pd.DataFrame(rows, columns=[
-                'date', 'open', 'high', 'low', 'close',
-                'volume', 'amount', 'pct_change'
-            ])
-            
             # 转换数据类型
-            df['date'] = pd.to_datetime(df['date'])
             for col in ['open', 'high', 'low', 'close', 'volume', 'amount', 'pct_change']:
                 df[col] = pd.to_numeric(df[col], errors='coerce')
             
-            df.set_index('date', inplace=True)
             return df
     
     def save_index_data(self, code: str, df: pd.DataFrame):
@@ -364,7 +481,7 @@ class StockDataCache:
             code: 指数代码
             df: 指数数据DataFrame
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             # 删除该指数的旧数据
@@ -392,7 +509,7 @@ class StockDataCache:
         Args:
             table: 表名（None表示清除所有）
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             if table is None:
@@ -411,6 +528,9 @@ class StockDataCache:
                 cursor.execute('DELETE FROM index_data')
             
             conn.commit()
+        
+        if table in (None, 'stock_list') and os.path.exists(self.stock_list_path):
+            os.remove(self.stock_list_path)
     
     def get_cache_info(self) -> dict:
         """
@@ -419,7 +539,7 @@ class StockDataCache:
         Returns:
             包含缓存统计信息的字典
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             info = {}
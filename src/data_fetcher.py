@@ -4,7 +4,8 @@
 import os
 import sys
 
-# 在导入任何其他模块之前清除代理环境变量
+# 在导入任何其他模块之前清除代理环境变量（会话另设 trust_env=False，无需每次请求重复清除）；
+# 也可用 scripts/run_noproxy.sh 启动，由 shell 在进程启动前去掉这些变量
 _proxy_vars = ['HTTP_PROXY', 'HTTPS_PROXY', 'http_proxy', 'https_proxy', 
                'ALL_PROXY', 'all_proxy', 'NO_PROXY', 'no_proxy']
 for _var in _proxy_vars:
@@ -80,20 +81,11 @@ class StockDataFetcher:
         self.retry_delay = 2
         self.session = session
     
-    def _clear_proxy_settings(self):
-        """清除代理设置，避免代理连接问题"""
-        # 清除环境变量中的代理设置
-        for var in _proxy_vars:
-            if var in os.environ:
-                del os.environ[var]
-    
     def _retry_fetch(self, func, *args, **kwargs):
         """带重试机制和指数退避的数据获取"""
         last_error = None
         for i in range(self.retry_times):
             try:
-                # 每次重试前清除代理设置
-                self._clear_proxy_settings()
                 result = func(*args, **kwargs)
                 
                 # 检查返回结果是否为空DataFrame
@@ -384,18 +376,20 @@ class StockDataFetcher:
             print(f"获取股票 {code} 财务报表失败: {e}")
             return pd.DataFrame()
     
-    def get_sector_stocks(self, sector: str) -> pd.DataFrame:
+    def get_sector_stocks(self, sector: str, all_stocks: Optional[pd.DataFrame] = None) -> pd.DataFrame:
         """
         获取某个板块的所有股票
         
         Args:
             sector: 板块名称 (如: 银行, 医药制造, 房地产等)
+            all_stocks: 已获取的全市场股票列表，循环查询多个板块时传入，避免每次重新获取
             
         Returns:
             DataFrame包含该板块股票列表
         """
         try:
-            all_stocks = self.get_stock_list()
+            if all_stocks is None:
+                all_stocks = self.get_stock_list()
             return all_stocks[all_stocks['industry'] == sector]
         except Exception as e:
             print(f"获取板块 {sector} 股票失败: {e}")
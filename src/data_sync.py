@@ -4,6 +4,8 @@
 """
 import time
 import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Any
 from pathlib import Path
@@ -85,6 +87,7 @@ class DataSyncService:
         """
         self.cache = StockDataCache(cache_path)
         self.fetcher = None
+        self._fetcher_lock = threading.Lock()
         self.use_akshare = use_akshare
         self.logger = SyncLogger()
         
@@ -104,22 +107,27 @@ class DataSyncService:
             'sync_in_progress': False,
             'errors': []
         }
+        
+        # 正在获取中的实时行情：股票代码 -> Future，并发的同步共用同一次请求
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
     
     def _get_fetcher(self):
         """获取数据获取器（懒加载）"""
-        if self.fetcher is None:
-            try:
-                if self.use_akshare:
-                    from src.data_fetcher import StockDataFetcher
-                    self.fetcher = StockDataFetcher()
-                    self.logger.info("使用akshare数据源（东方财富，速度更快）")
-                else:
-                    self.fetcher = BaoStockDataFetcher()
-                    self.logger.info("使用baostock数据源")
-            except Exception as e:
-                self.logger.error(f"初始化数据获取器失败: {e}")
-                return None
-        return self.fetcher
+        with self._fetcher_lock:
+            if self.fetcher is None:
+                try:
+                    if self.use_akshare:
+                        from src.data_fetcher import StockDataFetcher
+                        self.fetcher = StockDataFetcher()
+                        self.logger.info("使用akshare数据源（东方财富，速度更快）")
+                    else:
+                        self.fetcher = BaoStockDataFetcher()
+                        self.logger.info("使用baostock数据源")
+                except Exception as e:
+                    self.logger.error(f"初始化数据获取器失败: {e}")
+                    return None
+            return self.fetcher
     
     def _retry_sync(self, sync_func, *args, **kwargs) -> tuple:
         """
@@ -150,6 +158,59 @@ class DataSyncService:
         
         return False, None, last_error
     
+    def _fetch_spot_coalesced(self, fetcher, codes: List[str]) -> Dict[str, dict]:
+        """
+        获取一批股票的实时行情，合并并发的重复请求
+        
+        其他线程正在获取的代码不再重复请求，而是等待其结果；
+        其余代码由当前线程一次批量获取，并把结果交给等待者
+        
+        Args:
+            fetcher: 数据获取器
+            codes: 股票代码列表
+            
+        Returns:
+            字典，key为股票代码，value为行情数据
+        """
+        owned = []
+        waiting = {}
+        with self._inflight_lock:
+            for code in codes:
+                future = self._inflight.get(code)
+                if future is None:
+                    self._inflight[code] = Future()
+                    owned.append(code)
+                else:
+                    waiting[code] = future
+        
+        data = {}
+        error = None
+        try:
+            if owned:
+                data = fetcher.get_batch_spot_data(owned)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                futures = [self._inflight.pop(code) for code in owned]
+            for code, future in zip(owned, futures):
+                if error is None:
+                    future.set_result(data.get(code))
+                else:
+                    future.set_exception(error)
+        
+        for code, future in waiting.items():
+            try:
+                spot_data = future.result()
+            except Exception:
+                # 其他线程的请求失败，该代码留给下次同步
+                continue
+            if spot_data is not None:
+                data[code] = spot_data
+        
+        return data
+    
     def sync_stock_list(self) -> Dict[str, Any]:
         """
         同步股票列表
@@ -177,7 +238,9 @@ class DataSyncService:
             self.logger.end_task(task_name, 'failed', str(result))
             return result
         
-        success, data, error = self._retry_sync(fetcher.get_stock_list)
+        # baostock获取器带进程内缓存，同步时跳过它，避免返回旧列表
+        kwargs = {} if self.use_akshare else {'use_memo': False}
+        success, data, error = self._retry_sync(fetcher.get_stock_list, **kwargs)
         
         if success and not data.empty:
             result['success'] = True
@@ -288,7 +351,7 @@ class DataSyncService:
                 
                 self.logger.info(f"正在同步第 {batch_num}/{total_batches} 批次，共 {len(batch_codes)} 只股票")
                 
-                success, data, error = self._retry_sync(fetcher.get_batch_spot_data, batch_codes)
+                success, data, error = self._retry_sync(self._fetch_spot_coalesced, fetcher, batch_codes)
                 
                 if success:
                     all_data.update(data)
@@ -314,6 +377,31 @@ class DataSyncService:
         
         return result
     
+    def sync_missing_market_data(self, max_age_hours: int = 1) -> Dict[str, Any]:
+        """
+        只同步缓存中缺失或过期的实时行情（用于补齐上次同步失败的股票）
+        
+        Args:
+            max_age_hours: 行情缓存的最大有效时间（小时）
+            
+        Returns:
+            同步结果信息，格式同 sync_market_data
+        """
+        fetcher = self._get_fetcher()
+        if fetcher is None:
+            return {'task': '同步实时行情', 'success': False, 'errors': ["无法获取数据获取器"]}
+        
+        success, stock_list, error = self._retry_sync(fetcher.get_stock_list)
+        if not success or stock_list.empty:
+            return {'task': '同步实时行情', 'success': False, 'errors': [f"获取股票列表失败: {error}"]}
+        
+        missing = self.cache.get_missing_spot_codes(stock_list['code'].tolist(), max_age_hours)
+        self.logger.info(f"缓存中缺少 {len(missing)}/{len(stock_list)} 只股票的实时行情")
+        if not missing:
+            return {'task': '同步实时行情', 'success': True, 'total_stocks': 0, 'errors': []}
+        
+        return self.sync_market_data(missing)
+    
     def sync_index_data(self) -> Dict[str, Any]:
         """
         同步指数数据
@@ -396,15 +484,20 @@ class DataSyncService:
                 result['success'] = False
                 result['errors'].append(f"股票列表同步失败")
             
-            # 同步实时行情
-            market_result = self.sync_market_data()
-            result['tasks'].append(market_result)
-            if not market_result['success']:
-                result['success'] = False
-                result['errors'].append(f"实时行情同步失败")
-            
-            # 同步指数数据
-            index_result = self.sync_index_data()
+            # 实时行情依赖股票列表；指数数据与之无关，放到后台线程并行同步
+            # （baostock 查询在 query_lock 内串行，批次间的冷却时间可被利用）
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                index_future = executor.submit(self.sync_index_data)
+                
+                # 同步实时行情
+                market_result = self.sync_market_data()
+                result['tasks'].append(market_result)
+                if not market_result['success']:
+                    result['success'] = False
+                    result['errors'].append(f"实时行情同步失败")
+                
+                # 同步指数数据
+                index_result = index_future.result()
             result['tasks'].append(index_result)
             if not index_result['success']:
                 result['success'] = False
@@ -4,15 +4,72 @@
 import pandas as pd
 import numpy as np
 import time
-from typing import List, Dict, Optional, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Callable, Tuple
 from datetime import datetime, timedelta
 from .data_fetcher import StockDataFetcher
 from .baostock_fetcher import BaoStockDataFetcher
-from .technical_analysis import TechnicalAnalyzer
+from .technical_analysis import TechnicalAnalyzer, _tail_macd, _tail_rsi, _tail_boll, _tail_ma
+
+
+def _group_transform(hist: pd.DataFrame, column: str, func: Callable) -> pd.Series:
+    """按股票代码分组，对指定列逐组计算指标"""
+    return hist.groupby('code', sort=False)[column].transform(func)
+
+
+def _latest_by_code(hist: pd.DataFrame, min_len: int) -> pd.DataFrame:
+    """
+    取每只股票的最后一行
+    
+    Args:
+        hist: 带code列的长表
+        min_len: 最少数据条数，不足的股票被剔除
+        
+    Returns:
+        以code为索引的DataFrame
+    """
+    sizes = hist.groupby('code', sort=False)['close'].transform('size')
+    enough = hist[sizes >= min_len]
+    return enough.groupby('code', sort=False).tail(1).set_index('code')
+
+
+def _build_result(
+    latest: pd.DataFrame,
+    stocks_df: pd.DataFrame,
+    columns: Dict[str, str]
+) -> pd.DataFrame:
+    """
+    组装筛选结果
+    
+    Args:
+        latest: 命中的股票（以code为索引）
+        stocks_df: 股票列表，用于补充名称
+        columns: 结果列名 -> latest中的列名
+        
+    Returns:
+        包含code, name及指定列的DataFrame
+    """
+    names = stocks_df.drop_duplicates('code').set_index('code')['name']
+    data = {
+        'code': latest.index.to_numpy(),
+        'name': names.reindex(latest.index).to_numpy()
+    }
+    for out_col, src_col in columns.items():
+        data[out_col] = latest[src_col].to_numpy()
+    return pd.DataFrame(data)
 
 
 class StockStrategy:
-    """选股策略基类"""
+    """
+    选股策略基类
+    
+    子类可额外实现 score_one(analyzer, row)：基于已构建好的 TechnicalAnalyzer
+    判断单只股票，命中时返回结果字典，否则返回None。CompositeStrategy 会让
+    实现了它的策略共用同一份历史数据和分析器
+    """
+    
+    # 组合执行时该策略需要的历史数据天数
+    history_days = 30
     
     def __init__(self, fetcher=None):
         if fetcher is None:
@@ -20,6 +77,29 @@ class StockStrategy:
         else:
             self.fetcher = fetcher
         self.request_delay = 0.5  # 请求间隔（秒）
+        self.max_workers = 8  # 并发获取数据的线程数
+    
+    def _fetch_history(
+        self,
+        stocks_df: pd.DataFrame,
+        days: int,
+        request_delay: Optional[float] = None
+    ) -> pd.DataFrame:
+        """
+        一次性获取股票列表中所有股票的历史数据
+        
+        Returns:
+            带code列、行号为索引的长表
+        """
+        if request_delay is None:
+            request_delay = self.request_delay
+        hist = self.fetcher.get_historical_data_batch(
+            stocks_df['code'].tolist(),
+            days=days,
+            request_delay=request_delay,
+            max_workers=self.max_workers
+        )
+        return hist.reset_index(drop=True)
     
     def filter(self, stocks_df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -37,6 +117,25 @@ class StockStrategy:
 class MACDStrategy(StockStrategy):
     """MACD金叉策略"""
     
+    history_days = 5
+    
+    def score_one(self, analyzer: TechnicalAnalyzer, row) -> Optional[Dict]:
+        """基于分析器判断单只股票是否MACD金叉"""
+        if len(analyzer.df) < 26:
+            return None
+        macd_data = analyzer.macd()
+        macd = macd_data['macd'].to_numpy()
+        signal = macd_data['signal'].to_numpy()
+        if macd[-1] > signal[-1] and macd[-2] <= signal[-2]:
+            return {
+                'code': row.code,
+                'name': row.name,
+                'macd': macd[-1],
+                'signal': signal[-1],
+                'price': analyzer.close_np[-1]
+            }
+        return None
+    
     def filter(self, stocks_df: pd.DataFrame, days: int = 5) -> pd.DataFrame:
         """
         筛选MACD金叉的股票
@@ -48,40 +147,49 @@ class MACDStrategy(StockStrategy):
         Returns:
             符合条件的股票
         """
-        results = []
+        hist = self._fetch_history(stocks_df, days)
+        if hist.empty:
+            return pd.DataFrame()
         
-        for _, row in stocks_df.iterrows():
-            try:
-                code = row['code']
-                # 获取历史数据
-                df = self.fetcher.get_historical_data(code, days=days)
-                
-                if len(df) < 26:  # MACD需要至少26天数据
-                    continue
-                
-                # 计算MACD
-                analyzer = TechnicalAnalyzer(df)
-                macd_data = analyzer.macd()
-                
-                # 检查金叉
-                macd = macd_data['macd']
-                signal = macd_data['signal']
-                
-                # 当前MACD > Signal, 且前一天 MACD <= Signal
-                if macd.iloc[-1] > signal.iloc[-1] and macd.iloc[-2] <= signal.iloc[-2]:
-                    results.append({
-                        'code': code,
-                        'name': row['name'],
-                        'macd': macd.iloc[-1],
-                        'signal': signal.iloc[-1],
-                        'price': df['close'].iloc[-1]
-                    })
-            except Exception as e:
-                continue
-            finally:
-                time.sleep(self.request_delay)
+        # 分组计算MACD
+        ema_fast = _group_transform(hist, 'close', lambda s: s.ewm(span=12, adjust=False).mean())
+        ema_slow = _group_transform(hist, 'close', lambda s: s.ewm(span=26, adjust=False).mean())
+        hist['macd'] = ema_fast - ema_slow
+        hist['signal'] = _group_transform(hist, 'macd', lambda s: s.ewm(span=9, adjust=False).mean())
+        hist['macd_prev'] = hist.groupby('code', sort=False)['macd'].shift(1)
+        hist['signal_prev'] = hist.groupby('code', sort=False)['signal'].shift(1)
+        
+        # MACD需要至少26天数据
+        latest = _latest_by_code(hist, 26)
+        
+        # 当前MACD > Signal, 且前一天 MACD <= Signal
+        mask = ((latest['macd'] > latest['signal']) &
+                (latest['macd_prev'] <= latest['signal_prev']))
+        
+        return _build_result(latest[mask], stocks_df, {
+            'macd': 'macd',
+            'signal': 'signal',
+            'price': 'close'
+        })
+    
+    def filter_batch(self, codes: List[str], days: int = 60) -> pd.DataFrame:
+        """
+        按代码列表筛选MACD金叉的股票（无需股票列表DataFrame）
         
-        return pd.DataFrame(results)
+        历史数据一次批量获取，MACD在长表上分组计算，与 filter 共用同一流程
+        
+        Args:
+            codes: 股票代码列表
+            days: 获取历史数据的天数（MACD需要至少26条数据）
+            
+        Returns:
+            符合条件的股票，name列为空
+        """
+        codes = list(dict.fromkeys(codes))
+        if not codes:
+            return pd.DataFrame()
+        stocks_df = pd.DataFrame({'code': codes, 'name': None})
+        return self.filter(stocks_df, days=days)
 
 
 class RSIStrategy(StockStrategy):
@@ -91,6 +199,20 @@ class RSIStrategy(StockStrategy):
         super().__init__()
         self.oversold_threshold = oversold_threshold
     
+    def score_one(self, analyzer: TechnicalAnalyzer, row) -> Optional[Dict]:
+        """基于分析器判断单只股票是否RSI超卖"""
+        if len(analyzer.df) < 14:
+            return None
+        rsi = analyzer.rsi(14).iat[-1]
+        if rsi < self.oversold_threshold:
+            return {
+                'code': row.code,
+                'name': row.name,
+                'rsi': rsi,
+                'price': analyzer.close_np[-1]
+            }
+        return None
+    
     def filter(self, stocks_df: pd.DataFrame, days: int = 30) -> pd.DataFrame:
         """
         筛选RSI超卖的股票
@@ -98,39 +220,49 @@ class RSIStrategy(StockStrategy):
         Returns:
             RSI < 阈值的股票
         """
-        results = []
-        
-        for _, row in stocks_df.iterrows():
-            try:
-                code = row['code']
-                df = self.fetcher.get_historical_data(code, days=days)
-                
-                if len(df) < 14:
-                    continue
-                
-                analyzer = TechnicalAnalyzer(df)
-                rsi = analyzer.rsi()
-                
-                latest_rsi = rsi.iloc[-1]
-                
-                if latest_rsi < self.oversold_threshold:
-                    results.append({
-                        'code': code,
-                        'name': row['name'],
-                        'rsi': latest_rsi,
-                        'price': df['close'].iloc[-1]
-                    })
-            except Exception:
-                continue
-            finally:
-                time.sleep(self.request_delay)
+        hist = self._fetch_history(stocks_df, days)
+        if hist.empty:
+            return pd.DataFrame()
         
-        return pd.DataFrame(results)
+        period = 14
+        delta = hist.groupby('code', sort=False)['close'].diff()
+        hist['gain'] = delta.where(delta > 0, 0)
+        hist['loss'] = -delta.where(delta < 0, 0)
+        gain = _group_transform(hist, 'gain', lambda s: s.rolling(window=period).mean())
+        loss = _group_transform(hist, 'loss', lambda s: s.rolling(window=period).mean())
+        hist['rsi'] = 100 - (100 / (1 + gain / loss))
+        
+        latest = _latest_by_code(hist, period)
+        mask = latest['rsi'] < self.oversold_threshold
+        
+        return _build_result(latest[mask], stocks_df, {
+            'rsi': 'rsi',
+            'price': 'close'
+        })
 
 
 class BollingerStrategy(StockStrategy):
     """布林带策略 - 触及下轨买入"""
     
+    def score_one(self, analyzer: TechnicalAnalyzer, row) -> Optional[Dict]:
+        """基于分析器判断单只股票是否触及布林带下轨"""
+        if len(analyzer.df) < 20:
+            return None
+        boll = analyzer.boll(20, 2.0)
+        close = analyzer.close_np[-1]
+        upper = boll['upper'].iat[-1]
+        lower = boll['lower'].iat[-1]
+        if close <= lower * 1.02:
+            return {
+                'code': row.code,
+                'name': row.name,
+                'close': close,
+                'lower': lower,
+                'upper': upper,
+                'boll_pct': (close - lower) / (upper - lower) * 100
+            }
+        return None
+    
     def filter(self, stocks_df: pd.DataFrame, days: int = 30) -> pd.DataFrame:
         """
         筛选触及布林带下轨的股票
@@ -138,49 +270,57 @@ class BollingerStrategy(StockStrategy):
         Returns:
             触及下轨的股票
         """
-        results = []
-        
-        for _, row in stocks_df.iterrows():
-            try:
-                code = row['code']
-                df = self.fetcher.get_historical_data(code, days=days)
-                
-                if len(df) < 20:
-                    continue
-                
-                analyzer = TechnicalAnalyzer(df)
-                boll = analyzer.boll()
-                
-                close = df['close'].iloc[-1]
-                lower = boll['lower'].iloc[-1]
-                upper = boll['upper'].iloc[-1]
-                
-                # 价格接近或低于下轨
-                if close <= lower * 1.02:  # 允许2%的误差
-                    results.append({
-                        'code': code,
-                        'name': row['name'],
-                        'close': close,
-                        'lower': lower,
-                        'upper': upper,
-                        'boll_pct': (close - lower) / (upper - lower) * 100
-                    })
-            except Exception:
-                continue
-            finally:
-                time.sleep(self.request_delay)
+        hist = self._fetch_history(stocks_df, days)
+        if hist.empty:
+            return pd.DataFrame()
         
-        return pd.DataFrame(results)
+        period = 20
+        middle = _group_transform(hist, 'close', lambda s: s.rolling(window=period).mean())
+        std = _group_transform(hist, 'close', lambda s: s.rolling(window=period).std())
+        hist['upper'] = middle + std * 2.0
+        hist['lower'] = middle - std * 2.0
+        
+        latest = _latest_by_code(hist, period)
+        
+        # 价格接近或低于下轨
+        mask = latest['close'] <= latest['lower'] * 1.02  # 允许2%的误差
+        hits = latest[mask].copy()
+        hits['boll_pct'] = (hits['close'] - hits['lower']) / (hits['upper'] - hits['lower']) * 100
+        
+        return _build_result(hits, stocks_df, {
+            'close': 'close',
+            'lower': 'lower',
+            'upper': 'upper',
+            'boll_pct': 'boll_pct'
+        })
 
 
 class GoldenCrossStrategy(StockStrategy):
     """均线金叉策略"""
     
+    history_days = 60
+    
     def __init__(self, short_ma: int = 5, long_ma: int = 20):
         super().__init__()
         self.short_ma = short_ma
         self.long_ma = long_ma
     
+    def score_one(self, analyzer: TechnicalAnalyzer, row) -> Optional[Dict]:
+        """基于分析器判断单只股票是否均线金叉"""
+        if len(analyzer.df) < self.long_ma + 5:
+            return None
+        short = analyzer.ma(self.short_ma).to_numpy()
+        long = analyzer.ma(self.long_ma).to_numpy()
+        if short[-1] > long[-1] and short[-2] <= long[-2]:
+            return {
+                'code': row.code,
+                'name': row.name,
+                f'ma{self.short_ma}': short[-1],
+                f'ma{self.long_ma}': long[-1],
+                'price': analyzer.close_np[-1]
+            }
+        return None
+    
     def filter(self, stocks_df: pd.DataFrame, days: int = 60) -> pd.DataFrame:
         """
         筛选均线金叉的股票
@@ -188,37 +328,26 @@ class GoldenCrossStrategy(StockStrategy):
         Returns:
             金叉股票
         """
-        results = []
+        hist = self._fetch_history(stocks_df, days)
+        if hist.empty:
+            return pd.DataFrame()
         
-        for _, row in stocks_df.iterrows():
-            try:
-                code = row['code']
-                df = self.fetcher.get_historical_data(code, days=days)
-                
-                if len(df) < self.long_ma + 5:
-                    continue
-                
-                analyzer = TechnicalAnalyzer(df)
-                
-                short = analyzer.ma(self.short_ma)
-                long = analyzer.ma(self.long_ma)
-                
-                # 金叉判断
-                if (short.iloc[-1] > long.iloc[-1] and 
-                    short.iloc[-2] <= long.iloc[-2]):
-                    results.append({
-                        'code': code,
-                        'name': row['name'],
-                        f'ma{self.short_ma}': short.iloc[-1],
-                        f'ma{self.long_ma}': long.iloc[-1],
-                        'price': df['close'].iloc[-1]
-                    })
-            except Exception:
-                continue
-            finally:
-                time.sleep(self.request_delay)
+        hist['short'] = _group_transform(hist, 'close', lambda s: s.rolling(window=self.short_ma).mean())
+        hist['long'] = _group_transform(hist, 'close', lambda s: s.rolling(window=self.long_ma).mean())
+        hist['short_prev'] = hist.groupby('code', sort=False)['short'].shift(1)
+        hist['long_prev'] = hist.groupby('code', sort=False)['long'].shift(1)
+        
+        latest = _latest_by_code(hist, self.long_ma + 5)
         
-        return pd.DataFrame(results)
+        # 金叉判断
+        mask = ((latest['short'] > latest['long']) &
+                (latest['short_prev'] <= latest['long_prev']))
+        
+        return _build_result(latest[mask], stocks_df, {
+            f'ma{self.short_ma}': 'short',
+            f'ma{self.long_ma}': 'long',
+            'price': 'close'
+        })
 
 
 class VolumeBreakoutStrategy(StockStrategy):
@@ -228,6 +357,22 @@ class VolumeBreakoutStrategy(StockStrategy):
         super().__init__()
         self.volume_ratio = volume_ratio
     
+    def score_one(self, analyzer: TechnicalAnalyzer, row) -> Optional[Dict]:
+        """基于分析器判断单只股票是否放量上涨"""
+        if len(analyzer.df) < 20:
+            return None
+        volume_ratio = analyzer.volume_np[-1] / analyzer.volume_ma(20).iat[-1]
+        change = analyzer.df['pct_change'].iat[-1]
+        if volume_ratio > self.volume_ratio and change > 3:
+            return {
+                'code': row.code,
+                'name': row.name,
+                'volume_ratio': volume_ratio,
+                'change': change,
+                'price': analyzer.close_np[-1]
+            }
+        return None
+    
     def filter(self, stocks_df: pd.DataFrame, days: int = 30) -> pd.DataFrame:
         """
         筛选放量上涨的股票
@@ -235,42 +380,163 @@ class VolumeBreakoutStrategy(StockStrategy):
         Returns:
             放量股票
         """
-        results = []
+        feat = self.fetcher.get_latest_features(
+            stocks_df['code'].tolist(),
+            days=days,
+            window=20,
+            max_workers=self.max_workers
+        )
+        if feat.empty:
+            return pd.DataFrame()
         
-        for _, row in stocks_df.iterrows():
-            try:
-                code = row['code']
-                df = self.fetcher.get_historical_data(code, days=days)
-                
-                if len(df) < 20:
-                    continue
-                
-                # 今日成交量 vs 20日平均成交量
-                today_volume = df['volume'].iloc[-1]
-                avg_volume = df['volume'].rolling(window=20).mean().iloc[-1]
-                
-                # 今日涨幅
-                today_change = df['pct_change'].iloc[-1]
-                
-                # 放量且上涨
-                if (today_volume / avg_volume > self.volume_ratio and 
-                    today_change > 3):
-                    results.append({
-                        'code': code,
-                        'name': row['name'],
-                        'volume_ratio': today_volume / avg_volume,
-                        'change': today_change,
-                        'price': df['close'].iloc[-1]
-                    })
-            except Exception:
-                continue
+        latest = feat.set_index('code')
         
-        return pd.DataFrame(results)
+        # 今日成交量 vs 20日平均成交量
+        latest['volume_ratio'] = latest['volume'] / latest['vol_ma20']
+        
+        # 放量且上涨
+        mask = ((latest['volume_ratio'] > self.volume_ratio) &
+                (latest['pct_change'] > 3))
+        
+        return _build_result(latest[mask], stocks_df, {
+            'volume_ratio': 'volume_ratio',
+            'change': 'pct_change',
+            'price': 'close'
+        })
 
 
 class MultiIndicatorStrategy(StockStrategy):
     """多指标综合策略"""
     
+    # 各项信号的整数编码对应的标签，-1 表示无信号
+    MACD_LABELS = ('BEAR', 'BULL', 'GOLDEN_CROSS')
+    RSI_LABELS = ('NORMAL', 'OVERSOLD', 'OVERBOUGHT')
+    BOLL_LABELS = ('MIDDLE_UPPER', 'NEAR_UPPER', 'LOWER_HALF')
+    VOLUME_LABELS = ('HIGH', 'NORMAL', 'LOW')
+    MA_TREND_LABELS = ('STRONG_BULL', 'WEAK_BULL', 'BEAR')
+    
+    history_days = 60
+    
+    def _score_one(self, code: str, days: int) -> Optional[Tuple]:
+        """
+        获取单只股票数据并计算综合评分
+        
+        Returns:
+            总分达标时返回 (score, price, volume_ratio, 信号编码元组)，否则返回None
+        """
+        try:
+            df = self.fetcher.get_historical_data(code, days=days)
+            return self._score_arrays(
+                df['close'].to_numpy(dtype=np.float64),
+                df['volume'].to_numpy(dtype=np.float64)
+            )
+        except Exception:
+            return None
+        finally:
+            time.sleep(self.request_delay)
+    
+    def score_one(self, analyzer: TechnicalAnalyzer, row) -> Optional[Dict]:
+        """基于分析器计算单只股票的综合评分，达标时返回结果字典"""
+        res = self._score_arrays(analyzer.close_np, analyzer.volume_np)
+        if res is None:
+            return None
+        score, price, vol_ratio, (macd_sig, rsi_sig, boll_sig, volume_sig, ma_sig) = res
+        return {
+            'code': row.code,
+            'name': row.name,
+            'score': score,
+            'price': price,
+            'macd': self.MACD_LABELS[macd_sig],
+            'rsi': self.RSI_LABELS[rsi_sig],
+            'boll': self.BOLL_LABELS[boll_sig] if boll_sig >= 0 else np.nan,
+            'volume': self.VOLUME_LABELS[volume_sig],
+            'volume_ratio': vol_ratio,
+            'ma_trend': self.MA_TREND_LABELS[ma_sig]
+        }
+    
+    def _score_arrays(self, close_np: np.ndarray, volume_np: np.ndarray) -> Optional[Tuple]:
+        """
+        根据收盘价和成交量计算综合评分
+        
+        Returns:
+            总分达标时返回 (score, price, volume_ratio, 信号编码元组)，否则返回None
+        """
+        if len(close_np) < 60:
+            return None
+        
+        score = 0
+        
+        # 1. MACD判断
+        macd_last, macd_prev, signal_last, signal_prev = _tail_macd(close_np)
+        
+        if macd_last > signal_last:
+            score += 25
+            macd_sig = 1
+            if macd_prev <= signal_prev:
+                score += 10
+                macd_sig = 2
+        else:
+            macd_sig = 0
+        
+        # 2. RSI判断
+        latest_rsi = _tail_rsi(close_np)
+        
+        if 30 <= latest_rsi <= 70:
+            score += 25
+            rsi_sig = 0
+        elif latest_rsi < 30:
+            score += 15
+            rsi_sig = 1
+        else:
+            rsi_sig = 2
+        
+        # 3. 布林带判断
+        close = close_np[-1]
+        upper, middle, lower = _tail_boll(close_np)
+        
+        boll_pct = (close - lower) / (upper - lower)
+        
+        boll_sig = -1
+        if 0.4 <= boll_pct <= 0.8:
+            score += 25
+            boll_sig = 0
+        elif boll_pct > 0.8:
+            score += 15
+            boll_sig = 1
+        elif boll_pct < 0.4:
+            boll_sig = 2
+        
+        # 4. 成交量判断
+        vol_ratio = volume_np[-1] / _tail_ma(volume_np, 20)
+        
+        if vol_ratio > 1.5:
+            score += 25
+            volume_sig = 0
+        elif vol_ratio > 1.0:
+            score += 15
+            volume_sig = 1
+        else:
+            volume_sig = 2
+        
+        # 5. 均线排列
+        ma5 = _tail_ma(close_np, 5)
+        ma10 = _tail_ma(close_np, 10)
+        ma20 = _tail_ma(close_np, 20)
+        
+        if ma5 > ma10 > ma20:
+            score += 15
+            ma_sig = 0
+        elif ma5 > ma10:
+            score += 5
+            ma_sig = 1
+        else:
+            ma_sig = 2
+        
+        # 总分高于60分入选
+        if score >= 60:
+            return score, close, vol_ratio, (macd_sig, rsi_sig, boll_sig, volume_sig, ma_sig)
+        return None
+    
     def filter(self, stocks_df: pd.DataFrame, days: int = 60) -> pd.DataFrame:
         """
         多指标综合筛选
@@ -284,112 +550,48 @@ class MultiIndicatorStrategy(StockStrategy):
         Returns:
             综合评分高的股票
         """
-        results = []
-        
-        for _, row in stocks_df.iterrows():
-            try:
-                code = row['code']
-                df = self.fetcher.get_historical_data(code, days=days)
-                
-                if len(df) < 60:
-                    continue
-                
-                analyzer = TechnicalAnalyzer(df)
-                score = 0
-                signals = {}
-                
-                # 1. MACD判断
-                macd_data = analyzer.macd()
-                macd = macd_data['macd']
-                signal = macd_data['signal']
-                
-                if macd.iloc[-1] > signal.iloc[-1]:
-                    score += 25
-                    signals['macd'] = 'BULL'
-                    if macd.iloc[-2] <= signal.iloc[-2]:
-                        score += 10
-                        signals['macd'] = 'GOLDEN_CROSS'
-                else:
-                    signals['macd'] = 'BEAR'
-                
-                # 2. RSI判断
-                rsi = analyzer.rsi()
-                latest_rsi = rsi.iloc[-1]
-                
-                if 30 <= latest_rsi <= 70:
-                    score += 25
-                    signals['rsi'] = 'NORMAL'
-                elif latest_rsi < 30:
-                    score += 15
-                    signals['rsi'] = 'OVERSOLD'
-                else:
-                    signals['rsi'] = 'OVERBOUGHT'
-                
-                # 3. 布林带判断
-                boll = analyzer.boll()
-                close = df['close'].iloc[-1]
-                upper = boll['upper'].iloc[-1]
-                middle = boll['middle'].iloc[-1]
-                lower = boll['lower'].iloc[-1]
-                
-                boll_pct = (close - lower) / (upper - lower)
-                
-                if 0.4 <= boll_pct <= 0.8:
-                    score += 25
-                    signals['boll'] = 'MIDDLE_UPPER'
-                elif boll_pct > 0.8:
-                    score += 15
-                    signals['boll'] = 'NEAR_UPPER'
-                elif boll_pct < 0.4:
-                    signals['boll'] = 'LOWER_HALF'
-                
-                # 4. 成交量判断
-                vol_ratio = df['volume'].iloc[-1] / df['volume'].rolling(20).mean().iloc[-1]
-                
-                if vol_ratio > 1.5:
-                    score += 25
-                    signals['volume'] = 'HIGH'
-                elif vol_ratio > 1.0:
-                    score += 15
-                    signals['volume'] = 'NORMAL'
-                else:
-                    signals['volume'] = 'LOW'
-                
-                signals['volume_ratio'] = vol_ratio
-                
-                # 5. 均线排列
-                ma5 = analyzer.ma(5).iloc[-1]
-                ma10 = analyzer.ma(10).iloc[-1]
-                ma20 = analyzer.ma(20).iloc[-1]
-                
-                if ma5 > ma10 > ma20:
-                    score += 15
-                    signals['ma_trend'] = 'STRONG_BULL'
-                elif ma5 > ma10:
-                    score += 5
-                    signals['ma_trend'] = 'WEAK_BULL'
-                else:
-                    signals['ma_trend'] = 'BEAR'
-                
-                # 总分高于60分入选
-                if score >= 60:
-                    results.append({
-                        'code': code,
-                        'name': row['name'],
-                        'score': score,
-                        'price': close,
-                        **signals
-                    })
-            except Exception:
-                continue
-            finally:
-                time.sleep(self.request_delay)
-        
-        df_result = pd.DataFrame(results)
-        if not df_result.empty:
-            df_result = df_result.sort_values('score', ascending=False)
+        codes = stocks_df['code'].to_numpy(dtype=object)
+        names = stocks_df['name'].to_numpy(dtype=object)
+        n = len(codes)
+        
+        # 预分配结果列，命中的行按位置填入
+        mask = np.zeros(n, dtype=bool)
+        scores = np.zeros(n, dtype=np.int64)
+        prices = np.full(n, np.nan)
+        vol_ratios = np.full(n, np.nan)
+        sig_codes = np.full((n, 5), -1, dtype=np.int8)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._score_one, code, days) for code in codes]
+            for i, future in enumerate(futures):
+                res = future.result()
+                if res is not None:
+                    mask[i] = True
+                    scores[i], prices[i], vol_ratios[i], sig_codes[i] = res
+        
+        if not mask.any():
+            return pd.DataFrame()
         
-        return df_result
+        sig_codes = sig_codes[mask]
+        
+        def labels(col: int, label_names: Tuple[str, ...]) -> np.ndarray:
+            # 末尾追加NaN，编码-1正好取到它
+            return np.array(label_names + (np.nan,), dtype=object)[sig_codes[:, col]]
+        
+        df_result = pd.DataFrame({
+            'code': codes[mask],
+            'name': names[mask],
+            'score': scores[mask],
+            'price': prices[mask],
+            'macd': labels(0, self.MACD_LABELS),
+            'rsi': labels(1, self.RSI_LABELS),
+            'boll': labels(2, self.BOLL_LABELS),
+            'volume': labels(3, self.VOLUME_LABELS),
+            'volume_ratio': vol_ratios[mask],
+            'ma_trend': labels(4, self.MA_TREND_LABELS)
+        })
+        
+        return df_result.sort_values('score', ascending=False)
 
 
 class FundamentalStrategy(StockStrategy):
@@ -423,23 +625,29 @@ class FundamentalStrategy(StockStrategy):
         df = stocks_df.copy()
         
         # 转换数据类型
-        df['pe'] = pd.to_numeric(df['pe'], errors='coerce')
-        df['pb'] = pd.to_numeric(df['pb'], errors='coerce')
-        df['market_cap'] = pd.to_numeric(df['market_cap'], errors='coerce')
+        numeric_cols = ['pe', 'pb', 'market_cap']
+        df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors='coerce')
+        
+        pe = df['pe'].to_numpy()
+        pb = df['pb'].to_numpy()
+        market_cap = df['market_cap'].to_numpy()
         
-        # 应用筛选条件
+        # 应用筛选条件：合并为一个布尔掩码后统一索引
+        mask = np.ones(len(df), dtype=bool)
         if min_pe is not None:
-            df = df[df['pe'] >= min_pe]
+            mask &= pe >= min_pe
         if max_pe is not None:
-            df = df[df['pe'] <= max_pe]
+            mask &= pe <= max_pe
         if min_pb is not None:
-            df = df[df['pb'] >= min_pb]
+            mask &= pb >= min_pb
         if max_pb is not None:
-            df = df[df['pb'] <= max_pb]
+            mask &= pb <= max_pb
         if min_market_cap is not None:
-            df = df[df['market_cap'] >= min_market_cap * 1e8]
+            mask &= market_cap >= min_market_cap * 1e8
         if max_market_cap is not None:
-            df = df[df['market_cap'] <= max_market_cap * 1e8]
+            mask &= market_cap <= max_market_cap * 1e8
+        
+        df = df.loc[mask]
         
         return df
 
@@ -447,8 +655,10 @@ class FundamentalStrategy(StockStrategy):
 class CompositeStrategy:
     """复合策略 - 组合多个策略"""
     
-    def __init__(self):
+    def __init__(self, max_workers: int = 4):
         self.strategies = []
+        # 各策略内部已有逐股并发，这里保持较小的并发数避免线程过多
+        self.max_workers = max_workers
     
     def add_strategy(self, strategy: StockStrategy, weight: float = 1.0):
         """
@@ -460,20 +670,77 @@ class CompositeStrategy:
         """
         self.strategies.append((strategy, weight))
     
+    def _run_shared(self, strategies: List[Tuple], stocks_df: pd.DataFrame) -> List[pd.DataFrame]:
+        """
+        让实现了 score_one 的策略共用一份历史数据
+        
+        按这些策略中最长的 history_days 批量获取一次数据，每只股票只构建一个
+        TechnicalAnalyzer，各策略在同一分析器上判断，指标结果经分析器缓存共享
+        
+        Returns:
+            各策略的命中结果（已带 strategy_weight 列）
+        """
+        days = max(strategy.history_days for strategy, _ in strategies)
+        hist = strategies[0][0]._fetch_history(stocks_df, days)
+        if hist.empty:
+            return []
+        
+        rows = {row.code: row for row in stocks_df.drop_duplicates('code').itertuples(index=False)}
+        hits = [[] for _ in strategies]
+        for code, df in hist.groupby('code', sort=False):
+            try:
+                analyzer = TechnicalAnalyzer(df)
+            except Exception:
+                continue
+            row = rows[code]
+            for i, (strategy, _) in enumerate(strategies):
+                try:
+                    res = strategy.score_one(analyzer, row)
+                except Exception:
+                    continue
+                if res is not None:
+                    hits[i].append(res)
+        
+        results = []
+        for (_, weight), records in zip(strategies, hits):
+            if records:
+                result = pd.DataFrame(records)
+                result['strategy_weight'] = weight
+                results.append(result)
+        return results
+    
     def filter(self, stocks_df: pd.DataFrame) -> pd.DataFrame:
         """
         执行所有策略并综合评分
+        
+        实现了 score_one 的策略共用一次数据获取和每只股票一个分析器，
+        其余策略各自调用 filter 并发执行。共用数据时各策略看到的是
+        其中最长的历史区间
         """
         all_results = []
         
-        for strategy, weight in self.strategies:
-            try:
-                result = strategy.filter(stocks_df)
-                if not result.empty:
-                    result['strategy_weight'] = weight
-                    all_results.append(result)
-            except Exception:
-                continue
+        shared = [(s, w) for s, w in self.strategies if hasattr(s, 'score_one')]
+        separate = [(s, w) for s, w in self.strategies if not hasattr(s, 'score_one')]
+        
+        if shared:
+            all_results.extend(self._run_shared(shared, stocks_df))
+        
+        if separate:
+            # 各策略相互独立，并发执行
+            workers = min(self.max_workers, len(separate))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    (executor.submit(strategy.filter, stocks_df), weight)
+                    for strategy, weight in separate
+                ]
+                for future, weight in futures:
+                    try:
+                        result = future.result()
+                        if not result.empty:
+                            result['strategy_weight'] = weight
+                            all_results.append(result)
+                    except Exception:
+                        continue
         
         if not all_results:
             return pd.DataFrame()
@@ -1,9 +1,492 @@
 """
 技术分析模块 - 计算各种技术指标
 """
+import functools
+import inspect
+import math
 import pandas as pd
 import numpy as np
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple, Any
+from ._njit import njit, NUMBA_AVAILABLE
+
+
+def _cached(method):
+    """
+    指标结果缓存装饰器
+    
+    以 (方法名, 绑定后的全部参数) 为键，把结果存入实例的 _cache，
+    同一分析器上参数相同的重复调用直接返回已有结果。
+    返回的是共享对象，调用方不应原地修改
+    """
+    signature = inspect.signature(method)
+    
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        key = (method.__name__,) + tuple(bound.arguments.values())[1:]
+        if key not in self._cache:
+            self._cache[key] = method(self, *args, **kwargs)
+        return self._cache[key]
+    
+    return wrapper
+
+
+@njit(cache=True)
+def _kdj_loop(rsv: np.ndarray, n: int, m1: int, m2: int) -> Tuple[np.ndarray, np.ndarray]:
+    """KDJ的K、D递推，前n-1个值为0"""
+    size = rsv.size
+    k = np.zeros(size)
+    d = np.zeros(size)
+    if size < n:
+        return k, d
+    
+    # 平滑系数在循环外算好
+    k_prev_wt = m1 / (m1 + 1)
+    k_rsv_wt = 1 / (m1 + 1)
+    d_prev_wt = m2 / (m2 + 1)
+    d_k_wt = 1 / (m2 + 1)
+    
+    k[n-1] = rsv[n-1]
+    d[n-1] = rsv[n-1]
+    for i in range(n, size):
+        k[i] = k_prev_wt * k[i-1] + k_rsv_wt * rsv[i]
+        d[i] = d_prev_wt * d[i-1] + d_k_wt * k[i]
+    return k, d
+
+
+@njit(cache=True)
+def _ewm_update(weighted: float, old_wt: float, cur: float, alpha: float) -> Tuple[float, float]:
+    """
+    pandas ewm(adjust=False).mean() 的单步递推
+    
+    与 pandas 对缺失值的处理一致：缺失值处沿用上一个结果，
+    并让旧权重继续按 (1-alpha) 衰减
+    
+    Returns:
+        (新的均值, 新的旧权重)
+    """
+    if weighted == weighted:
+        old_wt *= 1.0 - alpha
+        if cur == cur:
+            if weighted != cur:
+                weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+            old_wt = 1.0
+    elif cur == cur:
+        weighted = cur
+    return weighted, old_wt
+
+
+@njit(cache=True)
+def _ema_loop(values: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    单次遍历计算EMA，结果与 pandas ewm(adjust=False).mean() 逐位一致
+    """
+    n = values.size
+    out = np.empty(n)
+    weighted = np.nan
+    old_wt = 1.0
+    for i in range(n):
+        weighted, old_wt = _ewm_update(weighted, old_wt, values[i], alpha)
+        out[i] = weighted
+    return out
+
+
+@njit(cache=True)
+def _tail_macd_loop(
+    close: np.ndarray,
+    alpha_fast: float,
+    alpha_slow: float,
+    alpha_signal: float
+) -> Tuple[float, float, float, float]:
+    """单次遍历计算最后两天的MACD和信号线，不生成中间序列"""
+    ema_fast = np.nan
+    ema_slow = np.nan
+    sig = np.nan
+    wt_fast = 1.0
+    wt_slow = 1.0
+    wt_signal = 1.0
+    
+    macd_last = np.nan
+    macd_prev = np.nan
+    sig_last = np.nan
+    sig_prev = np.nan
+    for i in range(close.size):
+        ema_fast, wt_fast = _ewm_update(ema_fast, wt_fast, close[i], alpha_fast)
+        ema_slow, wt_slow = _ewm_update(ema_slow, wt_slow, close[i], alpha_slow)
+        macd_prev = macd_last
+        sig_prev = sig_last
+        macd_last = ema_fast - ema_slow
+        sig, wt_signal = _ewm_update(sig, wt_signal, macd_last, alpha_signal)
+        sig_last = sig
+    return macd_last, macd_prev, sig_last, sig_prev
+
+
+def _tail_macd(
+    close: np.ndarray,
+    fast: int = 12,
+    slow: int = 26,
+    signal: int = 9
+) -> Tuple[float, float, float, float]:
+    """
+    最后两天的MACD和信号线，有numba时单次遍历，否则用pandas ewm
+    
+    Returns:
+        (macd_last, macd_prev, signal_last, signal_prev)
+    """
+    if NUMBA_AVAILABLE:
+        return _tail_macd_loop(close, 2.0 / (fast + 1), 2.0 / (slow + 1), 2.0 / (signal + 1))
+    
+    series = pd.Series(close)
+    macd = (series.ewm(span=fast, adjust=False).mean()
+            - series.ewm(span=slow, adjust=False).mean()).to_numpy()
+    sig = pd.Series(macd).ewm(span=signal, adjust=False).mean().to_numpy()
+    if close.size < 2:
+        last = macd[-1] if close.size else np.nan
+        sig_last = sig[-1] if close.size else np.nan
+        return last, np.nan, sig_last, np.nan
+    return macd[-1], macd[-2], sig[-1], sig[-2]
+
+
+@njit(cache=True)
+def _macd_fused(
+    close: np.ndarray,
+    alpha_fast: float,
+    alpha_slow: float,
+    alpha_signal: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    单次遍历同时计算快慢EMA、MACD线和信号线
+    
+    Returns:
+        (macd, signal, histogram)
+    """
+    n = close.size
+    macd = np.empty(n)
+    sig = np.empty(n)
+    hist = np.empty(n)
+    
+    ema_fast = np.nan
+    ema_slow = np.nan
+    ema_signal = np.nan
+    wt_fast = 1.0
+    wt_slow = 1.0
+    wt_signal = 1.0
+    for i in range(n):
+        ema_fast, wt_fast = _ewm_update(ema_fast, wt_fast, close[i], alpha_fast)
+        ema_slow, wt_slow = _ewm_update(ema_slow, wt_slow, close[i], alpha_slow)
+        m = ema_fast - ema_slow
+        ema_signal, wt_signal = _ewm_update(ema_signal, wt_signal, m, alpha_signal)
+        macd[i] = m
+        sig[i] = ema_signal
+        hist[i] = m - ema_signal
+    return macd, sig, hist
+
+
+# generate_signals 输出的数值列，与 _signals_fused 的输出列一一对应
+_SIGNAL_COLUMNS = (
+    'ma5', 'ma10', 'ma20', 'ma60',
+    'macd', 'macd_signal', 'macd_histogram',
+    'rsi', 'k', 'd', 'j',
+    'boll_upper', 'boll_middle', 'boll_lower',
+    'volume_ma20'
+)
+
+# 滚动均值状态字段：观测数、和、加/减补偿项、负数个数、连续相同值个数、上一个值
+_MEAN_STATE_SIZE = 7
+# 滚动方差状态字段：观测数、均值、离差平方和、加/减补偿项、数值不稳定标记
+_VAR_STATE_SIZE = 6
+_INV_COND_TOL = np.finfo(np.float64).eps * 1e3
+
+
+@njit(cache=True)
+def _mean_add(st: np.ndarray, val: float):
+    """滚动均值加入一个值，Kahan求和，与 pandas roll_mean 一致"""
+    if val == val:
+        st[0] += 1
+        y = val - st[2]
+        t = st[1] + y
+        st[2] = t - st[1] - y
+        st[1] = t
+        if math.copysign(1.0, val) < 0:
+            st[4] += 1
+        if val == st[6]:
+            st[5] += 1
+        else:
+            st[5] = 1
+        st[6] = val
+
+
+@njit(cache=True)
+def _mean_remove(st: np.ndarray, val: float):
+    """滚动均值移出一个值"""
+    if val == val:
+        st[0] -= 1
+        y = -val - st[3]
+        t = st[1] + y
+        st[3] = t - st[1] - y
+        st[1] = t
+        if math.copysign(1.0, val) < 0:
+            st[4] -= 1
+
+
+@njit(cache=True)
+def _mean_step(st: np.ndarray, values: np.ndarray, i: int, window: int) -> float:
+    """窗口右移到第i个值并返回当前均值"""
+    if i == 0:
+        st[:] = 0.0
+        st[6] = values[0]
+    elif i >= window:
+        _mean_remove(st, values[i - window])
+    _mean_add(st, values[i])
+    
+    nobs = st[0]
+    if nobs < window or nobs <= 0:
+        return np.nan
+    result = st[1] / nobs
+    if st[5] >= nobs:
+        # 窗口内全部相同，直接取该值，消除浮点误差
+        result = st[6]
+    elif st[4] == 0 and result < 0:
+        result = 0.0
+    elif st[4] == nobs and result > 0:
+        result = 0.0
+    return result
+
+
+@njit(cache=True)
+def _var_add(st: np.ndarray, val: float):
+    """滚动方差加入一个值，Welford + Kahan，与 pandas roll_var 一致"""
+    if val != val:
+        return
+    prev_m2 = st[2]
+    st[0] += 1
+    prev_mean = st[1] - st[3]
+    y = val - st[3]
+    t = y - st[1]
+    st[3] = t + st[1] - y
+    st[1] = st[1] + t / st[0]
+    st[2] = st[2] + (val - prev_mean) * (val - st[1])
+    if prev_m2 * _INV_COND_TOL > st[2]:
+        st[5] = 1.0
+
+
+@njit(cache=True)
+def _var_remove(st: np.ndarray, val: float):
+    """滚动方差移出一个值"""
+    if val != val:
+        return
+    prev_m2 = st[2]
+    st[0] -= 1
+    if st[0]:
+        prev_mean = st[1] - st[4]
+        y = val - st[4]
+        t = y - st[1]
+        st[4] = t + st[1] - y
+        st[1] = st[1] - t / st[0]
+        st[2] = st[2] - (val - prev_mean) * (val - st[1])
+        if prev_m2 * _INV_COND_TOL > st[2]:
+            st[5] = 1.0
+    else:
+        st[1] = 0.0
+        st[2] = 0.0
+        st[5] = 0.0
+
+
+@njit(cache=True)
+def _std_step(st: np.ndarray, values: np.ndarray, i: int, window: int) -> float:
+    """窗口右移到第i个值并返回当前样本标准差(ddof=1)"""
+    if i > 0:
+        if i >= window:
+            _var_remove(st, values[i - window])
+        _var_add(st, values[i])
+    if i == 0 or st[5]:
+        # 首个窗口或出现数值不稳定时，从头重算当前窗口
+        st[:] = 0.0
+        for j in range(max(0, i + 1 - window), i + 1):
+            _var_add(st, values[j])
+        st[5] = 0.0
+    
+    nobs = st[0]
+    if nobs < window or nobs <= 1:
+        return np.nan
+    var = st[2] / (nobs - 1)
+    if var < 0:
+        return 0.0
+    return math.sqrt(var)
+
+
+@njit(cache=True, error_model='numpy')
+def _signals_fused(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray
+) -> np.ndarray:
+    """
+    单次遍历计算 generate_signals 的全部数值指标
+    
+    均线、RSI、布林带的滚动统计沿用 pandas rolling 的增量算法，
+    MACD 使用 _ewm_update，KDJ 与 _kdj_loop 递推相同。
+    输入不能含缺失值
+    
+    Returns:
+        (n, len(_SIGNAL_COLUMNS)) 数组，列顺序同 _SIGNAL_COLUMNS
+    """
+    n = close.size
+    out = np.empty((n, 15))
+    
+    ma_windows = (5, 10, 20, 60)
+    ma_state = np.zeros((4, _MEAN_STATE_SIZE))
+    rsi_state = np.zeros((2, _MEAN_STATE_SIZE))
+    vol_state = np.zeros(_MEAN_STATE_SIZE)
+    std_state = np.zeros(_VAR_STATE_SIZE)
+    gain = np.empty(n)
+    loss = np.empty(n)
+    
+    alpha_fast = 2.0 / 13
+    alpha_slow = 2.0 / 27
+    alpha_signal = 2.0 / 10
+    ema_fast = np.nan
+    ema_slow = np.nan
+    ema_signal = np.nan
+    wt_fast = 1.0
+    wt_slow = 1.0
+    wt_signal = 1.0
+    
+    k = 0.0
+    d = 0.0
+    for i in range(n):
+        # 均线
+        for w in range(4):
+            out[i, w] = _mean_step(ma_state[w], close, i, ma_windows[w])
+        
+        # MACD
+        ema_fast, wt_fast = _ewm_update(ema_fast, wt_fast, close[i], alpha_fast)
+        ema_slow, wt_slow = _ewm_update(ema_slow, wt_slow, close[i], alpha_slow)
+        m = ema_fast - ema_slow
+        ema_signal, wt_signal = _ewm_update(ema_signal, wt_signal, m, alpha_signal)
+        out[i, 4] = m
+        out[i, 5] = ema_signal
+        out[i, 6] = m - ema_signal
+        
+        # RSI(14)，首日涨跌记为0，亏损列中的0为-0.0
+        delta = close[i] - close[i-1] if i > 0 else np.nan
+        gain[i] = delta if delta > 0 else 0.0
+        loss[i] = -delta if delta < 0 else -0.0
+        avg_gain = _mean_step(rsi_state[0], gain, i, 14)
+        avg_loss = _mean_step(rsi_state[1], loss, i, 14)
+        out[i, 7] = 100 - (100 / (1 + avg_gain / avg_loss))
+        
+        # KDJ(9, 3, 3)
+        if i >= 8:
+            llv = low[i]
+            hhv = high[i]
+            for j in range(i - 8, i):
+                llv = min(llv, low[j])
+                hhv = max(hhv, high[j])
+            rsv = (close[i] - llv) / (hhv - llv) * 100
+            if i == 8:
+                k = rsv
+                d = rsv
+            else:
+                k = 3/(3+1) * k + 1/(3+1) * rsv
+                d = 3/(3+1) * d + 1/(3+1) * k
+        out[i, 8] = k
+        out[i, 9] = d
+        out[i, 10] = 3 * k - 2 * d
+        
+        # 布林带(20, 2)，中轨即20日均线
+        std = _std_step(std_state, close, i, 20)
+        out[i, 11] = out[i, 2] + std * 2.0
+        out[i, 12] = out[i, 2]
+        out[i, 13] = out[i, 2] - std * 2.0
+        
+        # 成交量均线
+        out[i, 14] = _mean_step(vol_state, volume, i, 20)
+    return out
+
+
+@njit(cache=True)
+def _rolling_mean_loop(values: np.ndarray, window: int) -> np.ndarray:
+    """逐点推进 _mean_step，结果与 pandas rolling(window).mean() 逐位一致"""
+    out = np.empty(values.size)
+    st = np.zeros(_MEAN_STATE_SIZE)
+    for i in range(values.size):
+        out[i] = _mean_step(st, values, i, window)
+    return out
+
+
+@njit(cache=True)
+def _rolling_std_loop(values: np.ndarray, window: int) -> np.ndarray:
+    """逐点推进 _std_step，结果与 pandas rolling(window).std() 逐位一致"""
+    out = np.empty(values.size)
+    st = np.zeros(_VAR_STATE_SIZE)
+    for i in range(values.size):
+        out[i] = _std_step(st, values, i, window)
+    return out
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    定长窗口滚动均值，等价于 rolling(window).mean()
+    
+    有numba时复用 _signals_fused 的Kahan求和状态机，否则交给pandas；
+    两条路径与 generate_signals 的融合内核逐位一致，信号判断不会因路径不同而改变
+    """
+    if window <= 0:
+        return np.full(values.size, np.nan)
+    if NUMBA_AVAILABLE:
+        return _rolling_mean_loop(values, window)
+    return pd.Series(values).rolling(window).mean().to_numpy()
+
+
+def _rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """定长窗口滚动样本标准差(ddof=1)，等价于 rolling(window).std()"""
+    if window <= 1:
+        return np.full(values.size, np.nan)
+    if NUMBA_AVAILABLE:
+        return _rolling_std_loop(values, window)
+    return pd.Series(values).rolling(window).std().to_numpy()
+
+
+def _tail_ma(values: np.ndarray, period: int) -> float:
+    """
+    最后一天的简单移动平均
+    
+    取 _rolling_mean 的最后一个值而非直接对窗口求均值：pandas 的滚动和
+    按整段序列递推，末位舍入与窗口单独求和不同，横盘窗口也要精确等于该值，
+    否则均线大小关系会在临界处翻转
+    """
+    if values.size < period:
+        return np.nan
+    return float(_rolling_mean(values, period)[-1])
+
+
+def _tail_rsi(close: np.ndarray, period: int = 14) -> float:
+    """最后一天的RSI，与 TechnicalAnalyzer.rsi() 结果一致"""
+    if close.size < period:
+        return np.nan
+    
+    delta = np.diff(close, prepend=np.nan)
+    gain = _rolling_mean(np.where(delta > 0, delta, 0.0), period)[-1]
+    loss = _rolling_mean(np.where(delta < 0, -delta, 0.0), period)[-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return float(100 - 100 / (1 + np.float64(gain) / loss))
+
+
+def _tail_boll(close: np.ndarray, period: int = 20, std_dev: float = 2.0) -> Tuple[float, float, float]:
+    """
+    最后一天的布林带，与 TechnicalAnalyzer.boll() 结果一致（横盘时标准差为0）
+    
+    Returns:
+        (upper, middle, lower)
+    """
+    if close.size < period:
+        return np.nan, np.nan, np.nan
+    middle = float(_rolling_mean(close, period)[-1])
+    std = float(_rolling_std(close, period)[-1])
+    return middle + std * std_dev, middle, middle - std * std_dev
 
 
 class TechnicalAnalyzer:
@@ -14,10 +497,15 @@ class TechnicalAnalyzer:
         初始化
         
         Args:
-            df: 包含OHLCV数据的DataFrame
+            df: 包含OHLCV数据的DataFrame。不做整表复制，分析器存续期间调用方不应修改它
         """
-        self.df = df.copy()
+        self.df = df
         self._validate_data()
+        self._cache: Dict[tuple, Any] = {}
+        
+        # 常用列的numpy视图，供各指标复用
+        self.close_np = self.df['close'].to_numpy(dtype=np.float64)
+        self.volume_np = self.df['volume'].to_numpy(dtype=np.float64)
     
     def _validate_data(self):
         """验证数据格式"""
@@ -27,12 +515,24 @@ class TechnicalAnalyzer:
             raise ValueError(f"缺少必要的列: {missing}")
     
     # ==================== 移动平均线 ====================
+    @_cached
     def ma(self, period: int = 20, column: str = 'close') -> pd.Series:
         """简单移动平均线"""
-        return self.df[column].rolling(window=period).mean()
+        values = self.df[column].to_numpy(dtype=np.float64)
+        return pd.Series(_rolling_mean(values, period), index=self.df.index, name=column)
     
+    @_cached
+    def std(self, period: int = 20, column: str = 'close') -> pd.Series:
+        """滚动标准差，供布林带和波动率共用"""
+        values = self.df[column].to_numpy(dtype=np.float64)
+        return pd.Series(_rolling_std(values, period), index=self.df.index, name=column)
+    
+    @_cached
     def ema(self, period: int = 20, column: str = 'close') -> pd.Series:
         """指数移动平均线"""
+        if NUMBA_AVAILABLE:
+            values = self.df[column].to_numpy(dtype=np.float64)
+            return pd.Series(_ema_loop(values, 2.0 / (period + 1)), index=self.df.index, name=column)
         return self.df[column].ewm(span=period, adjust=False).mean()
     
     def sma(self, period: int = 20, column: str = 'close') -> pd.Series:
@@ -41,12 +541,17 @@ class TechnicalAnalyzer:
     
     def wma(self, period: int = 20, column: str = 'close') -> pd.Series:
         """加权移动平均线"""
-        weights = np.arange(1, period + 1)
-        return self.df[column].rolling(window=period).apply(
-            lambda x: np.dot(x, weights) / weights.sum(), raw=True
-        )
+        values = self.df[column].to_numpy(dtype=np.float64)
+        out = np.full(len(values), np.nan)
+        if len(values) >= period:
+            weights = np.arange(1, period + 1, dtype=np.float64)
+            weights /= weights.sum()
+            windows = np.lib.stride_tricks.sliding_window_view(values, period)
+            out[period-1:] = windows @ weights
+        return pd.Series(out, index=self.df.index, name=column)
     
     # ==================== MACD ====================
+    @_cached
     def macd(
         self,
         fast: int = 12,
@@ -59,6 +564,16 @@ class TechnicalAnalyzer:
         Returns:
             dict包含: macd_line, signal_line, histogram
         """
+        if NUMBA_AVAILABLE:
+            macd_arr, signal_arr, hist_arr = _macd_fused(
+                self.close_np, 2.0 / (fast + 1), 2.0 / (slow + 1), 2.0 / (signal + 1)
+            )
+            return {
+                'macd': pd.Series(macd_arr, index=self.df.index),
+                'signal': pd.Series(signal_arr, index=self.df.index),
+                'histogram': pd.Series(hist_arr, index=self.df.index)
+            }
+        
         ema_fast = self.ema(fast)
         ema_slow = self.ema(slow)
         
@@ -73,6 +588,7 @@ class TechnicalAnalyzer:
         }
     
     # ==================== RSI ====================
+    @_cached
     def rsi(self, period: int = 14) -> pd.Series:
         """
         相对强弱指标RSI
@@ -83,14 +599,15 @@ class TechnicalAnalyzer:
         Returns:
             RSI值 (0-100)
         """
-        delta = self.df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+        delta = np.diff(self.close_np, prepend=np.nan)
+        gain = _rolling_mean(np.where(delta > 0, delta, 0.0), period)
+        loss = _rolling_mean(np.where(delta < 0, -delta, 0.0), period)
         
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = gain / loss
+            rsi = 100 - (100 / (1 + rs))
         
-        return rsi
+        return pd.Series(rsi, index=self.df.index, name='close')
     
     def rsi_6_12_24(self) -> pd.DataFrame:
         """常用RSI组合 (6, 12, 24)"""
@@ -123,21 +640,38 @@ class TechnicalAnalyzer:
         
         rsv = (self.df['close'] - low_list) / (high_list - low_list) * 100
         
-        k = pd.Series(np.zeros(len(self.df)), index=self.df.index)
-        d = pd.Series(np.zeros(len(self.df)), index=self.df.index)
-        
-        k.iloc[n-1] = rsv.iloc[n-1]
-        d.iloc[n-1] = rsv.iloc[n-1]
-        
-        for i in range(n, len(self.df)):
-            k.iloc[i] = m1/(m1+1) * k.iloc[i-1] + 1/(m1+1) * rsv.iloc[i]
-            d.iloc[i] = m2/(m2+1) * d.iloc[i-1] + 1/(m2+1) * k.iloc[i]
+        if NUMBA_AVAILABLE:
+            k_arr, d_arr = _kdj_loop(rsv.to_numpy(dtype=np.float64), n, m1, m2)
+            k = pd.Series(k_arr, index=self.df.index)
+            d = pd.Series(d_arr, index=self.df.index)
+        else:
+            k, d = self._kdj_ewm(rsv, n, m1, m2)
         
         j = 3 * k - 2 * d
         
         return pd.DataFrame({'K': k, 'D': d, 'J': j})
     
+    def _kdj_ewm(self, rsv: pd.Series, n: int, m1: int, m2: int) -> Tuple[pd.Series, pd.Series]:
+        """
+        无numba时的KDJ递推：从第n个值起按 ewm(adjust=False) 平滑，与 _kdj_loop 一致
+        
+        递推中一旦遇到缺失值，其后全部为NaN（ewm 会跳过缺失值，这里补回该行为）
+        """
+        k = pd.Series(0.0, index=self.df.index)
+        d = pd.Series(0.0, index=self.df.index)
+        if len(rsv) < n:
+            return k, d
+        
+        tail = rsv.iloc[n-1:]
+        broken = tail.isna().cummax().to_numpy()
+        k_tail = tail.ewm(alpha=1 / (m1 + 1), adjust=False).mean().mask(broken)
+        d_tail = k_tail.ewm(alpha=1 / (m2 + 1), adjust=False).mean().mask(broken)
+        k.iloc[n-1:] = k_tail.to_numpy()
+        d.iloc[n-1:] = d_tail.to_numpy()
+        return k, d
+    
     # ==================== BOLL ====================
+    @_cached
     def boll(self, period: int = 20, std_dev: float = 2.0) -> pd.DataFrame:
         """
         布林带 (Bollinger Bands)
@@ -150,7 +684,7 @@ class TechnicalAnalyzer:
             DataFrame包含 upper, middle, lower
         """
         middle = self.ma(period)
-        std = self.df['close'].rolling(window=period).std()
+        std = self.std(period)
         
         upper = middle + (std * std_dev)
         lower = middle - (std * std_dev)
@@ -162,26 +696,26 @@ class TechnicalAnalyzer:
         })
     
     # ==================== 成交量指标 ====================
+    @_cached
     def volume_ma(self, period: int = 20) -> pd.Series:
         """成交量移动平均线"""
-        return self.df['volume'].rolling(window=period).mean()
+        return pd.Series(_rolling_mean(self.volume_np, period), index=self.df.index, name='volume')
     
     def obv(self) -> pd.Series:
         """
         能量潮指标 (On Balance Volume)
         """
-        obv = pd.Series(index=self.df.index, dtype=float)
-        obv.iloc[0] = 0
-        
-        for i in range(1, len(self.df)):
-            if self.df['close'].iloc[i] > self.df['close'].iloc[i-1]:
-                obv.iloc[i] = obv.iloc[i-1] + self.df['volume'].iloc[i]
-            elif self.df['close'].iloc[i] < self.df['close'].iloc[i-1]:
-                obv.iloc[i] = obv.iloc[i-1] - self.df['volume'].iloc[i]
-            else:
-                obv.iloc[i] = obv.iloc[i-1]
-        
-        return obv
+        close = self.close_np
+        volume = self.volume_np
+        if close.size == 0:
+            return pd.Series(index=self.df.index, dtype=float)
+        
+        # 涨为+1，跌为-1，持平或缺失为0；持平日不计成交量（即便成交量缺失），沿用前值
+        direction = np.sign(np.diff(close, prepend=close[0]))
+        direction[np.isnan(direction)] = 0
+        obv = np.cumsum(np.where(direction == 0, 0.0, direction * volume))
+        obv[0] = 0
+        return pd.Series(obv, index=self.df.index)
     
     def volume_ratio(self, short_period: int = 5, long_period: int = 60) -> pd.Series:
         """
@@ -192,49 +726,43 @@ class TechnicalAnalyzer:
         return short_ma / long_ma
     
     # ==================== 趋势指标 ====================
+    @_cached
+    def _true_range(self) -> np.ndarray:
+        """真实波幅，atr 和 adx 共用（首日前收盘价为缺失值）"""
+        high = self.df['high'].to_numpy(dtype=np.float64)
+        low = self.df['low'].to_numpy(dtype=np.float64)
+        prev_close = np.roll(self.close_np, 1)
+        if prev_close.size:
+            prev_close[0] = np.nan
+        
+        # fmax 忽略缺失值，与 DataFrame.max(axis=1) 一致
+        return np.fmax.reduce([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+    
+    @_cached
     def atr(self, period: int = 14) -> pd.Series:
         """
         平均真实波幅 (Average True Range)
         """
-        high = self.df['high']
-        low = self.df['low']
-        close = self.df['close']
-        
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-        
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr = tr.rolling(window=period).mean()
-        
-        return atr
+        return pd.Series(self._true_range(), index=self.df.index).rolling(window=period).mean()
     
     def adx(self, period: int = 14) -> pd.DataFrame:
         """
         平均趋向指数 (Average Directional Index)
         """
-        high = self.df['high']
-        low = self.df['low']
-        close = self.df['close']
-        
-        # +DM 和 -DM
-        plus_dm = high.diff()
-        minus_dm = low.diff().abs()
+        high_np = self.df['high'].to_numpy(dtype=np.float64)
+        low_np = self.df['low'].to_numpy(dtype=np.float64)
         
-        plus_dm[plus_dm < 0] = 0
-        minus_dm[minus_dm < 0] = 0
+        # +DM 和 -DM（首日为缺失值）
+        up = np.diff(high_np, prepend=np.nan)
+        down = np.abs(np.diff(low_np, prepend=np.nan))
         
-        plus_dm[plus_dm <= minus_dm] = 0
-        minus_dm[minus_dm <= plus_dm] = 0
+        plus_dm = np.where((up < 0) | (up <= down), 0.0, up)
+        minus_dm = np.where(down <= plus_dm, 0.0, down)
         
-        # 真实波幅
-        tr = pd.concat([
-            high - low,
-            abs(high - close.shift()),
-            abs(low - close.shift())
-        ], axis=1).max(axis=1)
+        plus_dm = pd.Series(plus_dm, index=self.df.index)
+        minus_dm = pd.Series(minus_dm, index=self.df.index)
         
-        atr = tr.rolling(window=period).mean()
+        atr = self.atr(period)
         
         # +DI 和 -DI
         plus_di = 100 * plus_dm.rolling(window=period).mean() / atr
@@ -254,6 +782,8 @@ class TechnicalAnalyzer:
     def bollinger_pct(self, period: int = 20) -> pd.Series:
         """
         布林带百分比 (%B)
+        
+        复用已缓存的布林带结果，不再重复计算滚动标准差
         """
         boll = self.boll(period)
         return (self.df['close'] - boll['lower']) / (boll['upper'] - boll['lower'])
@@ -262,7 +792,7 @@ class TechnicalAnalyzer:
         """
         波动率 (标准差)
         """
-        return self.df['close'].rolling(window=period).std() / self.df['close'] * 100
+        return self.std(period) / self.df['close'] * 100
     
     # ==================== 动量指标 ====================
     def roc(self, period: int = 12) -> pd.Series:
@@ -278,6 +808,25 @@ class TechnicalAnalyzer:
         return self.df['close'] - self.df['close'].shift(period)
     
     # ==================== 综合信号 ====================
+    def compute_all(self) -> Dict:
+        """
+        一次计算绘图常用的全部指标
+        
+        均线、布林带共用同一份MA20和滚动标准差，MACD复用EMA，
+        结果都进入分析器缓存
+        
+        Returns:
+            dict包含: ma(周期->均线), macd, rsi, boll, kdj, vol_ma
+        """
+        return {
+            'ma': {period: self.ma(period) for period in (5, 10, 20, 60)},
+            'macd': self.macd(),
+            'rsi': self.rsi(),
+            'boll': self.boll(),
+            'kdj': self.kdj(),
+            'vol_ma': self.volume_ma(20)
+        }
+    
     def generate_signals(self) -> pd.DataFrame:
         """
         生成综合技术分析信号
@@ -285,6 +834,19 @@ class TechnicalAnalyzer:
         Returns:
             DataFrame包含各种指标和信号
         """
+        if NUMBA_AVAILABLE and not self._has_missing_ohlcv():
+            signals = pd.DataFrame(
+                _signals_fused(
+                    self.df['high'].to_numpy(dtype=np.float64),
+                    self.df['low'].to_numpy(dtype=np.float64),
+                    self.close_np,
+                    self.volume_np
+                ),
+                index=self.df.index,
+                columns=list(_SIGNAL_COLUMNS)
+            )
+            return self._add_signal_labels(signals)
+        
         signals = pd.DataFrame(index=self.df.index)
         
         # 移动平均线
@@ -317,6 +879,20 @@ class TechnicalAnalyzer:
         # 成交量
         signals['volume_ma20'] = self.volume_ma(20)
         
+        return self._add_signal_labels(signals)
+    
+    def _has_missing_ohlcv(self) -> bool:
+        """高、低、收盘价或成交量中是否有缺失值"""
+        return bool(
+            np.isnan(self.close_np).any()
+            or np.isnan(self.volume_np).any()
+            or self.df['high'].isna().any()
+            or self.df['low'].isna().any()
+        )
+    
+    @staticmethod
+    def _add_signal_labels(signals: pd.DataFrame) -> pd.DataFrame:
+        """根据数值指标生成趋势、MACD、RSI、KDJ信号列"""
         # 趋势信号
         signals['trend'] = np.where(
             signals['ma5'] > signals['ma10'], 'UP', 'DOWN'
@@ -352,21 +928,12 @@ class TechnicalAnalyzer:
         if len(signals) == 0:
             return {}
         
-        latest = signals.iloc[-1]
-        return {
-            'ma5': latest['ma5'],
-            'ma10': latest['ma10'],
-            'ma20': latest['ma20'],
-            'macd': latest['macd'],
-            'macd_signal': latest['macd_signal_type'],
-            'rsi': latest['rsi'],
-            'rsi_signal': latest['rsi_signal'],
-            'k': latest['k'],
-            'd': latest['d'],
-            'j': latest['j'],
-            'kdj_signal': latest['kdj_signal'],
-            'trend': latest['trend']
-        }
+        # 取最后一行整体转为字典，数值一次性转换为Python原生类型（可直接JSON序列化）
+        latest = signals.iloc[-1:][[
+            'ma5', 'ma10', 'ma20', 'macd', 'macd_signal_type', 'rsi', 'rsi_signal',
+            'k', 'd', 'j', 'kdj_signal', 'trend'
+        ]].rename(columns={'macd_signal_type': 'macd_signal'})
+        return latest.to_dict(orient='records')[0]
 
 
 # 便捷函数
@@ -1,35 +1,248 @@
 """
 数据可视化模块 - 提供多种图表展示
 """
+import os
+import functools
+import matplotlib
+# 无界面环境（服务器、批量出图）可设置 MPL_HEADLESS 使用非交互后端
+if os.environ.get('MPL_HEADLESS'):
+    matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
-from matplotlib.patches import Rectangle
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.lines import Line2D
 import pandas as pd
 import numpy as np
+from types import SimpleNamespace
 from typing import Optional, List, Dict, Tuple
-from .technical_analysis import TechnicalAnalyzer
+from .technical_analysis import TechnicalAnalyzer, _rolling_mean
+from ._njit import njit, prange, NUMBA_AVAILABLE
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    import seaborn as sns
+except ImportError:  # seaborn 可选，缺失时用 matplotlib 绘制热力图
+    sns = None
+
 # 设置中文字体
 plt.rcParams['font.sans-serif'] = ['SimHei', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False
 
 
+@njit(cache=True)
+def _cum_and_drawdown(pct: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    单次遍历计算累计收益倍数和回撤(%)
+    
+    与 cumprod + expanding().max() 一致：缺失的涨跌幅处结果为NaN，
+    累计值和历史最高点跳过该值继续
+    """
+    n = pct.size
+    cum = np.empty(n)
+    drawdown = np.empty(n)
+    c = 1.0
+    peak = -np.inf
+    for i in range(n):
+        if pct[i] == pct[i]:
+            c *= 1 + pct[i] / 100
+            if c > peak:
+                peak = c
+            cum[i] = c
+            drawdown[i] = (c - peak) / peak * 100
+        else:
+            cum[i] = np.nan
+            drawdown[i] = np.nan
+    return cum, drawdown
+
+
+@njit(cache=True)
+def _moments(values: np.ndarray) -> Tuple[float, float, float, float]:
+    """
+    单次遍历计算均值、标准差、偏度、峰度
+    
+    增量更新各阶中心矩；标准差(ddof=1)、偏度、峰度(超额)的修正方式与
+    pandas 的 std()/skew()/kurtosis() 一致。输入不能含缺失值
+    
+    Returns:
+        (mean, std, skew, kurt)
+    """
+    n = 0
+    mean = 0.0
+    m2 = 0.0
+    m3 = 0.0
+    m4 = 0.0
+    for x in values:
+        n1 = n
+        n += 1
+        delta = x - mean
+        delta_n = delta / n
+        delta_n2 = delta_n * delta_n
+        term1 = delta * delta_n * n1
+        mean += delta_n
+        m4 += term1 * delta_n2 * (n * n - 3 * n + 3) + 6 * delta_n2 * m2 - 4 * delta_n * m3
+        m3 += term1 * delta_n * (n - 2) - 3 * delta_n * m2
+        m2 += term1
+    
+    if n == 0:
+        return np.nan, np.nan, np.nan, np.nan
+    std = np.sqrt(m2 / (n - 1)) if n > 1 else np.nan
+    
+    if n < 3:
+        skew = np.nan
+    elif m2 == 0:
+        skew = 0.0
+    else:
+        skew = n * (n - 1) ** 0.5 / (n - 2) * (m3 / m2 ** 1.5)
+    
+    if n < 4:
+        kurt = np.nan
+    elif m2 == 0:
+        kurt = 0.0
+    else:
+        adj = 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+        kurt = n * (n + 1) * (n - 1) * m4 / ((n - 2) * (n - 3) * m2 ** 2) - adj
+    return mean, std, skew, kurt
+
+
+@njit(parallel=True, cache=True)
+def _candle_vertices(x: np.ndarray, o: np.ndarray, h: np.ndarray, l: np.ndarray,
+                     c: np.ndarray, half_width: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    按K线并行生成影线线段和实体矩形的顶点
+    
+    Returns:
+        (wicks, bodies)，形状分别为 (n, 2, 2) 和 (n, 4, 2)
+    """
+    n = x.size
+    wicks = np.empty((n, 2, 2))
+    bodies = np.empty((n, 4, 2))
+    for i in prange(n):
+        wicks[i, 0, 0] = x[i]
+        wicks[i, 0, 1] = l[i]
+        wicks[i, 1, 0] = x[i]
+        wicks[i, 1, 1] = h[i]
+        bottom = np.minimum(o[i], c[i])
+        top = np.maximum(o[i], c[i])
+        left = x[i] - half_width
+        right = x[i] + half_width
+        bodies[i, 0, 0] = left
+        bodies[i, 0, 1] = bottom
+        bodies[i, 1, 0] = right
+        bodies[i, 1, 1] = bottom
+        bodies[i, 2, 0] = right
+        bodies[i, 2, 1] = top
+        bodies[i, 3, 0] = left
+        bodies[i, 3, 1] = top
+    return wicks, bodies
+
+
+# 绘图时局部生效的渲染参数：Agg 渲染时合并近似共线的线段并分块绘制长路径，
+# 线条尖角连接走不混合的快速路径。只在绘图方法内生效，不改动进程全局设置
+_RENDER_RC = {
+    'path.simplify': True,
+    'path.simplify_threshold': 1.0,
+    'agg.path.chunksize': 10000,
+    'lines.solid_joinstyle': 'miter',
+}
+
+
+def _render_rc(method):
+    """绘图方法装饰器：在 _RENDER_RC 的 rc_context 内执行"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with plt.rc_context(_RENDER_RC):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class StockVisualizer:
     """股票数据可视化器"""
     
-    def __init__(self, style: str = 'default'):
+    # 数据点超过该数量时折线栅格化输出，避免矢量格式下顶点过多
+    rasterize_threshold = 5000
+    # 相关性矩阵超过该股票数时不标注数值，避免逐格创建 N² 个文本对象
+    annotate_max = 20
+    
+    def __init__(self, style: str = 'default', max_points: int = 5000):
+        """
+        Args:
+            style: matplotlib 样式
+            max_points: 时间序列图最多绘制的K线数，超出时分桶抽稀；0表示不限制
+        """
         self.style = style
+        self.max_points = max_points
         plt.style.use(style)
     
+    def _bucket_ends(self, n: int) -> Optional[np.ndarray]:
+        """
+        数据点超过 max_points 时等长分桶
+        
+        Returns:
+            各桶最后一行的位置；无需抽稀时为None
+        """
+        if not self.max_points or n <= self.max_points:
+            return None
+        stride = -(-n // self.max_points)
+        return np.minimum(np.arange(stride, n + stride, stride), n) - 1
+    
+    def _maybe_decimate(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Optional[np.ndarray]]:
+        """
+        K线过多时按桶聚合，保持OHLC语义
+        
+        每桶开盘价取首行、最高/最低价取极值、成交量求和，其余列取桶内最后一行
+        
+        Returns:
+            (用于绘图的DataFrame, 各桶最后一行的位置；未抽稀时为None)
+        """
+        ends = self._bucket_ends(len(df))
+        if ends is None:
+            return df, None
+        
+        starts = np.concatenate([[0], ends[:-1] + 1])
+        out = df.iloc[ends].copy()
+        if 'open' in df:
+            out['open'] = df['open'].to_numpy()[starts]
+        if 'high' in df:
+            out['high'] = np.maximum.reduceat(df['high'].to_numpy(dtype=np.float64), starts)
+        if 'low' in df:
+            out['low'] = np.minimum.reduceat(df['low'].to_numpy(dtype=np.float64), starts)
+        if 'volume' in df:
+            out['volume'] = np.add.reduceat(df['volume'].to_numpy(dtype=np.float64), starts)
+        return out, ends
+    
+    @classmethod
+    def _take(cls, obj, ends: Optional[np.ndarray]):
+        """按桶末位置抽取指标序列（支持 Series/DataFrame/ndarray 及其字典）"""
+        if ends is None:
+            return obj
+        if isinstance(obj, dict):
+            return {key: cls._take(value, ends) for key, value in obj.items()}
+        if isinstance(obj, (pd.Series, pd.DataFrame)):
+            return obj.iloc[ends]
+        return obj[ends]
+    
+    @staticmethod
+    def _finish(fig, save_path: Optional[str], show: bool) -> None:
+        """保存图像，并按需显示；不显示时关闭图像释放内存"""
+        if save_path:
+            fig.savefig(save_path, dpi=150, bbox_inches='tight')
+            print(f"图表已保存至: {save_path}")
+        
+        if show:
+            plt.show()
+        else:
+            plt.close(fig)
+    
+    @_render_rc
     def plot_kline(
         self,
         df: pd.DataFrame,
         title: str = "K线图",
         volume: bool = True,
         save_path: Optional[str] = None,
-        figsize: Tuple[int, int] = (16, 10)
+        figsize: Tuple[int, int] = (16, 10),
+        show: bool = True
     ) -> None:
         """
         绘制K线图
@@ -40,6 +253,7 @@ class StockVisualizer:
             volume: 是否显示成交量
             save_path: 保存路径
             figsize: 图像尺寸
+            show: 是否显示窗口，为False时绘制完即关闭图像
         """
         if volume:
             fig, (ax1, ax2) = plt.subplots(2, 1, figsize=figsize, 
@@ -48,17 +262,21 @@ class StockVisualizer:
             fig, ax1 = plt.subplots(figsize=figsize)
             ax2 = None
         
+        # 均线基于完整数据计算，K线过多时再按桶抽稀
+        close_np = df['close'].to_numpy(dtype=np.float64)
+        full_len = len(df)
+        df, ends = self._maybe_decimate(df)
+        
         # 绘制K线
-        self._draw_candles(ax1, df)
+        ctx = self._candle_context(df, 1 if ends is None else int(ends[0]) + 1)
+        self._draw_candles(ax1, df, ctx)
         
         # 绘制移动平均线
-        if len(df) >= 60:
-            ax1.plot(df.index, df['close'].rolling(5).mean(), 
-                    label='MA5', color='orange', alpha=0.7)
-            ax1.plot(df.index, df['close'].rolling(20).mean(), 
-                    label='MA20', color='blue', alpha=0.7)
-            ax1.plot(df.index, df['close'].rolling(60).mean(), 
-                    label='MA60', color='red', alpha=0.7)
+        if full_len >= 60:
+            self._plot_mas(ax1, df.index, self._take({
+                period: _rolling_mean(close_np, period) for period in (5, 20, 60)
+            }, ends), {5: 'orange', 20: 'blue', 60: 'red'},
+                rasterized=len(df) > self.rasterize_threshold)
             ax1.legend(loc='upper left')
         
         ax1.set_title(title, fontsize=14, fontweight='bold')
@@ -67,9 +285,7 @@ class StockVisualizer:
         
         # 绘制成交量
         if volume and ax2 is not None:
-            colors = ['red' if df['close'].iloc[i] >= df['open'].iloc[i] 
-                     else 'green' for i in range(len(df))]
-            ax2.bar(df.index, df['volume'], color=colors, alpha=0.7)
+            ax2.bar(df.index, ctx.v, width=ctx.width, color=ctx.colors, alpha=0.7, rasterized=True)
             ax2.set_ylabel('成交量')
             ax2.grid(True, alpha=0.3)
         
@@ -83,43 +299,103 @@ class StockVisualizer:
         
         plt.tight_layout()
         
-        if save_path:
-            plt.savefig(save_path, dpi=150, bbox_inches='tight')
-            print(f"图表已保存至: {save_path}")
+        self._finish(fig, save_path, show)
+    
+    @staticmethod
+    def _plot_mas(ax, index, mas: Dict[int, np.ndarray], colors: Dict[int, str],
+                  rasterized: bool = False) -> None:
+        """
+        绘制一组均线
         
-        plt.show()
+        Args:
+            mas: 周期 -> 均线数值
+            colors: 周期 -> 颜色
+            rasterized: 是否栅格化输出
+        """
+        for period, values in mas.items():
+            ax.plot(index, values, label=f'MA{period}', color=colors[period],
+                    rasterized=rasterized)
     
-    def _draw_candles(self, ax, df: pd.DataFrame) -> None:
-        """绘制蜡烛图"""
-        for i, (idx, row) in enumerate(df.iterrows()):
-            open_price = row['open']
-            close_price = row['close']
-            high_price = row['high']
-            low_price = row['low']
-            
-            # 确定颜色
-            color = 'red' if close_price >= open_price else 'green'
-            
-            # 绘制实体
-            height = abs(close_price - open_price)
-            bottom = min(open_price, close_price)
-            
-            # 绘制影线
-            ax.plot([idx, idx], [low_price, high_price], 
-                   color=color, linewidth=1)
+    @staticmethod
+    def _up_down_colors(df: pd.DataFrame) -> np.ndarray:
+        """按收盘价是否不低于开盘价给出每根K线的红/绿颜色"""
+        return np.where(df['close'].to_numpy() >= df['open'].to_numpy(), 'red', 'green')
+    
+    @staticmethod
+    def _date_nums(index) -> np.ndarray:
+        """日期索引整体转换为matplotlib的数值坐标（字符串日期也先统一解析）"""
+        return mdates.date2num(pd.DatetimeIndex(index).to_numpy())
+    
+    @classmethod
+    def _candle_context(cls, df: pd.DataFrame, stride: int = 1) -> SimpleNamespace:
+        """
+        一次性提取K线各面板共用的数组
+        
+        Args:
+            stride: 每根K线合并的原始K线数，用于放宽实体和柱子宽度
+        
+        Returns:
+            包含 x(日期数值)、o/h/l/c/v(开高低收量)、colors(涨跌颜色)
+            和 width(实体宽度) 的命名空间
+        """
+        return SimpleNamespace(
+            width=0.8 * stride,
+            x=cls._date_nums(df.index),
+            o=df['open'].to_numpy(dtype=np.float64),
+            h=df['high'].to_numpy(dtype=np.float64),
+            l=df['low'].to_numpy(dtype=np.float64),
+            c=df['close'].to_numpy(dtype=np.float64),
+            v=df['volume'].to_numpy(dtype=np.float64),
+            colors=cls._up_down_colors(df)
+        )
+    
+    def _draw_candles(self, ax, df: pd.DataFrame, ctx: Optional[SimpleNamespace] = None) -> None:
+        """
+        绘制蜡烛图（影线和实体各用一个集合批量绘制）
+        
+        Args:
+            ctx: _candle_context 的结果，已有时传入以复用数组
+        """
+        if ctx is None:
+            ctx = self._candle_context(df)
+        colors = ctx.colors
+        
+        if NUMBA_AVAILABLE:
+            wicks, bodies = _candle_vertices(ctx.x, ctx.o, ctx.h, ctx.l, ctx.c, ctx.width / 2)
+        else:
+            x = ctx.x
+            # 影线: 每根K线一条 (x, low) -> (x, high) 的线段
+            wicks = np.stack([
+                np.column_stack([x, ctx.l]),
+                np.column_stack([x, ctx.h])
+            ], axis=1)
             
-            # 绘制实体
-            rect = Rectangle((mdates.date2num(idx) - 0.4, bottom), 
-                           0.8, height, 
-                           facecolor=color, edgecolor=color)
-            ax.add_patch(rect)
+            # 实体: 宽 ctx.width 的矩形，四个顶点
+            bottom = np.minimum(ctx.o, ctx.c)
+            top = np.maximum(ctx.o, ctx.c)
+            left = x - ctx.width / 2
+            right = x + ctx.width / 2
+            bodies = np.stack([
+                np.column_stack([left, bottom]),
+                np.column_stack([right, bottom]),
+                np.column_stack([right, top]),
+                np.column_stack([left, top])
+            ], axis=1)
+        
+        ax.xaxis_date()
+        ax.add_collection(LineCollection(wicks, colors=colors, linewidths=1))
+        ax.add_collection(PolyCollection(bodies, facecolors=colors, edgecolors=colors))
+        ax.autoscale_view()
     
+    @_render_rc
     def plot_with_indicators(
         self,
         df: pd.DataFrame,
         indicators: List[str] = ['ma', 'macd', 'rsi', 'boll'],
         title: str = "技术分析图",
-        save_path: Optional[str] = None
+        save_path: Optional[str] = None,
+        analyzer: Optional[TechnicalAnalyzer] = None,
+        show: bool = True
     ) -> None:
         """
         绘制带有技术指标的综合分析图
@@ -129,9 +405,11 @@ class StockVisualizer:
             indicators: 要显示的指标列表
             title: 图表标题
             save_path: 保存路径
+            analyzer: 已基于df构建的分析器，传入时复用其已缓存的指标
+            show: 是否显示窗口，为False时绘制完即关闭图像
         """
         # 创建子图
-        n_plots = 1 + len([i for i in indicators if i != 'ma'])
+        n_plots = 1 + sum(i != 'ma' for i in indicators)
         fig, axes = plt.subplots(n_plots, 1, figsize=(16, 4 * n_plots), 
                                 sharex=True)
         
@@ -140,33 +418,37 @@ class StockVisualizer:
         
         # 主图: K线和MA
         ax_main = axes[0]
-        self._draw_candles(ax_main, df)
         
-        analyzer = TechnicalAnalyzer(df)
+        # 指标基于完整数据计算，K线过多时再按桶抽稀
+        if analyzer is None:
+            analyzer = TechnicalAnalyzer(df)
+        computed = analyzer.compute_all()
+        df, ends = self._maybe_decimate(df)
+        computed = self._take(computed, ends)
+        
+        # K线、成交量面板共用同一份数组
+        ctx = self._candle_context(df, 1 if ends is None else int(ends[0]) + 1)
+        self._draw_candles(ax_main, df, ctx)
+        dense = len(df) > self.rasterize_threshold
         
         # 添加移动平均线
         if 'ma' in indicators:
-            ma5 = analyzer.ma(5)
-            ma10 = analyzer.ma(10)
-            ma20 = analyzer.ma(20)
-            ma60 = analyzer.ma(60)
-            
-            ax_main.plot(df.index, ma5, label='MA5', color='orange', alpha=0.8)
-            ax_main.plot(df.index, ma10, label='MA10', color='green', alpha=0.8)
-            ax_main.plot(df.index, ma20, label='MA20', color='blue', alpha=0.8)
-            ax_main.plot(df.index, ma60, label='MA60', color='red', alpha=0.8)
+            # 分析器缓存的均线，布林带中轨直接复用MA20
+            self._plot_mas(ax_main, df.index, {
+                period: computed['ma'][period] for period in (5, 10, 20, 60)
+            }, {5: 'orange', 10: 'green', 20: 'blue', 60: 'red'}, rasterized=dense)
         
         # 添加布林带
         if 'boll' in indicators:
-            boll = analyzer.boll()
+            boll = computed['boll']
             ax_main.plot(df.index, boll['upper'], label='BOLL Upper', 
-                        color='purple', linestyle='--', alpha=0.7)
+                        color='purple', linestyle='--', rasterized=dense)
             ax_main.plot(df.index, boll['middle'], label='BOLL Middle', 
-                        color='gray', linestyle='--', alpha=0.7)
+                        color='gray', linestyle='--', rasterized=dense)
             ax_main.plot(df.index, boll['lower'], label='BOLL Lower', 
-                        color='purple', linestyle='--', alpha=0.7)
+                        color='purple', linestyle='--', rasterized=dense)
             ax_main.fill_between(df.index, boll['upper'], boll['lower'], 
-                               alpha=0.1, color='gray')
+                               alpha=0.1, color='gray', rasterized=True)
         
         ax_main.set_title(title, fontsize=14, fontweight='bold')
         ax_main.set_ylabel('价格')
@@ -177,16 +459,17 @@ class StockVisualizer:
         
         # MACD
         if 'macd' in indicators and plot_idx < len(axes):
-            macd_data = analyzer.macd()
+            macd_data = computed['macd']
+            hist_arr = macd_data['histogram'].to_numpy()
             ax_macd = axes[plot_idx]
             
             ax_macd.plot(df.index, macd_data['macd'], 
-                        label='MACD', color='blue', alpha=0.8)
+                        label='MACD', color='blue', rasterized=dense)
             ax_macd.plot(df.index, macd_data['signal'], 
-                        label='Signal', color='red', alpha=0.8)
-            ax_macd.bar(df.index, macd_data['histogram'], 
-                       color=['red' if x > 0 else 'green' for x in macd_data['histogram']], 
-                       alpha=0.5, label='Histogram')
+                        label='Signal', color='red', rasterized=dense)
+            ax_macd.bar(df.index, macd_data['histogram'], width=ctx.width, 
+                       color=np.where(hist_arr > 0, 'red', 'green'), 
+                       alpha=0.5, label='Histogram', rasterized=True)
             ax_macd.axhline(y=0, color='black', linestyle='-', linewidth=0.5)
             ax_macd.set_ylabel('MACD')
             ax_macd.legend(loc='upper left')
@@ -195,13 +478,13 @@ class StockVisualizer:
         
         # RSI
         if 'rsi' in indicators and plot_idx < len(axes):
-            rsi = analyzer.rsi()
+            rsi = computed['rsi']
             ax_rsi = axes[plot_idx]
             
-            ax_rsi.plot(df.index, rsi, label='RSI', color='purple', alpha=0.8)
+            ax_rsi.plot(df.index, rsi, label='RSI', color='purple', rasterized=dense)
             ax_rsi.axhline(y=70, color='red', linestyle='--', alpha=0.7, label='Overbought')
             ax_rsi.axhline(y=30, color='green', linestyle='--', alpha=0.7, label='Oversold')
-            ax_rsi.fill_between(df.index, 30, 70, alpha=0.1, color='gray')
+            ax_rsi.fill_between(df.index, 30, 70, alpha=0.1, color='gray', rasterized=True)
             ax_rsi.set_ylabel('RSI')
             ax_rsi.set_ylim(0, 100)
             ax_rsi.legend(loc='upper left')
@@ -210,12 +493,12 @@ class StockVisualizer:
         
         # KDJ
         if 'kdj' in indicators and plot_idx < len(axes):
-            kdj = analyzer.kdj()
+            kdj = computed['kdj']
             ax_kdj = axes[plot_idx]
             
-            ax_kdj.plot(df.index, kdj['K'], label='K', color='blue', alpha=0.8)
-            ax_kdj.plot(df.index, kdj['D'], label='D', color='orange', alpha=0.8)
-            ax_kdj.plot(df.index, kdj['J'], label='J', color='purple', alpha=0.8)
+            ax_kdj.plot(df.index, kdj['K'], label='K', color='blue', rasterized=dense)
+            ax_kdj.plot(df.index, kdj['D'], label='D', color='orange', rasterized=dense)
+            ax_kdj.plot(df.index, kdj['J'], label='J', color='purple', rasterized=dense)
             ax_kdj.axhline(y=80, color='red', linestyle='--', alpha=0.7)
             ax_kdj.axhline(y=20, color='green', linestyle='--', alpha=0.7)
             ax_kdj.set_ylabel('KDJ')
@@ -225,13 +508,11 @@ class StockVisualizer:
         
         # 成交量
         if 'volume' in indicators and plot_idx < len(axes):
-            vol_ma = analyzer.volume_ma(20)
+            vol_ma = computed['vol_ma']
             ax_vol = axes[plot_idx]
             
-            colors = ['red' if df['close'].iloc[i] >= df['open'].iloc[i] 
-                     else 'green' for i in range(len(df))]
-            ax_vol.bar(df.index, df['volume'], color=colors, alpha=0.7)
-            ax_vol.plot(df.index, vol_ma, label='Vol MA20', color='orange')
+            ax_vol.bar(df.index, ctx.v, width=ctx.width, color=ctx.colors, alpha=0.7, rasterized=True)
+            ax_vol.plot(df.index, vol_ma, label='Vol MA20', color='orange', rasterized=dense)
             ax_vol.set_ylabel('成交量')
             ax_vol.legend(loc='upper left')
             ax_vol.grid(True, alpha=0.3)
@@ -243,16 +524,14 @@ class StockVisualizer:
         plt.setp(axes[-1].xaxis.get_majorticklabels(), rotation=45)
         plt.tight_layout()
         
-        if save_path:
-            plt.savefig(save_path, dpi=150, bbox_inches='tight')
-            print(f"图表已保存至: {save_path}")
-        
-        plt.show()
+        self._finish(fig, save_path, show)
     
+    @_render_rc
     def plot_correlation(
         self,
         data_dict: Dict[str, pd.DataFrame],
-        save_path: Optional[str] = None
+        save_path: Optional[str] = None,
+        show: bool = True
     ) -> None:
         """
         绘制多只股票的相关性热力图
@@ -260,17 +539,41 @@ class StockVisualizer:
         Args:
             data_dict: 股票代码和数据的字典
             save_path: 保存路径
+            show: 是否显示窗口，为False时绘制完即关闭图像
         """
         # 提取收盘价
-        close_prices = pd.DataFrame()
-        for code, df in data_dict.items():
-            close_prices[code] = df['close']
-        
-        # 计算相关性
-        corr = close_prices.corr()
+        close_prices = pd.concat(
+            {code: df['close'] for code, df in data_dict.items()}, axis=1
+        )
+        
+        # 计算相关性：无缺失值时 np.corrcoef 一次矩阵运算得到全部系数，
+        # 有缺失值时仍用 pandas 按每对股票的共同日期计算
+        mat = close_prices.to_numpy(dtype=np.float64)
+        if len(mat) >= 2 and not np.isnan(mat).any():
+            with np.errstate(divide='ignore', invalid='ignore'):
+                corr = pd.DataFrame(np.corrcoef(mat, rowvar=False),
+                                    index=close_prices.columns, columns=close_prices.columns)
+        else:
+            corr = close_prices.corr()
         
         # 绘制热力图
         fig, ax = plt.subplots(figsize=(10, 8))
+        
+        annot = len(corr.columns) <= self.annotate_max
+        if sns is not None:
+            sns.heatmap(corr, annot=annot, fmt='.2f', cmap='coolwarm',
+                        vmin=-1, vmax=1, ax=ax)
+            ax.set_title('股票价格相关性矩阵', fontsize=14, fontweight='bold')
+        else:
+            self._draw_corr_matrix(fig, ax, corr, annot)
+        
+        plt.tight_layout()
+        
+        self._finish(fig, save_path, show)
+    
+    @staticmethod
+    def _draw_corr_matrix(fig, ax, corr: pd.DataFrame, annot: bool = True) -> None:
+        """不依赖seaborn绘制相关性矩阵，annot为True时逐格标注数值"""
         im = ax.imshow(corr, cmap='coolwarm', vmin=-1, vmax=1)
         
         # 设置刻度
@@ -279,28 +582,24 @@ class StockVisualizer:
         ax.set_xticklabels(corr.columns, rotation=45, ha='right')
         ax.set_yticklabels(corr.columns)
         
-        # 添加数值标签
-        for i in range(len(corr.columns)):
-            for j in range(len(corr.columns)):
-                text = ax.text(j, i, f'{corr.iloc[i, j]:.2f}',
-                             ha="center", va="center", color="black")
+        # 添加数值标签：坐标和文本一次性生成，逐格只剩创建文本对象
+        if annot:
+            n = len(corr.columns)
+            rows, cols = np.divmod(np.arange(n * n), n)
+            labels = np.char.mod('%.2f', corr.to_numpy().ravel())
+            for i, j, label in zip(rows, cols, labels):
+                ax.text(j, i, label, ha="center", va="center", color="black")
         
         ax.set_title('股票价格相关性矩阵', fontsize=14, fontweight='bold')
         fig.colorbar(im, ax=ax)
-        
-        plt.tight_layout()
-        
-        if save_path:
-            plt.savefig(save_path, dpi=150, bbox_inches='tight')
-            print(f"图表已保存至: {save_path}")
-        
-        plt.show()
     
+    @_render_rc
     def plot_performance_comparison(
         self,
         data_dict: Dict[str, pd.DataFrame],
         normalize: bool = True,
-        save_path: Optional[str] = None
+        save_path: Optional[str] = None,
+        show: bool = True
     ) -> None:
         """
         绘制多只股票收益对比图
@@ -309,42 +608,55 @@ class StockVisualizer:
             data_dict: 股票代码和数据的字典
             normalize: 是否归一化
             save_path: 保存路径
+            show: 是否显示窗口，为False时绘制完即关闭图像
         """
         fig, ax = plt.subplots(figsize=(14, 7))
         
-        for code, df in data_dict.items():
-            prices = df['close']
-            
-            if normalize:
+        # 所有股票的曲线放进一个LineCollection一次绘制
+        segments = []
+        for df in data_dict.values():
+            prices = df['close'].to_numpy(dtype=np.float64)
+            if normalize and prices.size:
                 # 归一化到起始日为100
-                normalized_prices = prices / prices.iloc[0] * 100
-                ax.plot(df.index, normalized_prices, label=code, alpha=0.8, linewidth=2)
-                ax.set_ylabel('归一化价格 (起始日=100)')
-            else:
-                ax.plot(df.index, prices, label=code, alpha=0.8, linewidth=2)
-                ax.set_ylabel('价格')
+                prices = prices / prices[0] * 100
+            ends = self._bucket_ends(len(df))
+            segments.append(np.column_stack([
+                self._take(self._date_nums(df.index), ends), self._take(prices, ends)
+            ]))
+        
+        cycle = plt.rcParams['axes.prop_cycle'].by_key()['color']
+        colors = [cycle[i % len(cycle)] for i in range(len(segments))]
+        
+        ax.xaxis_date()
+        ax.add_collection(LineCollection(segments, colors=colors, linewidths=2, alpha=0.8))
+        ax.autoscale_view()
+        ax.set_ylabel('归一化价格 (起始日=100)' if normalize else '价格')
+        
+        # 集合没有逐条图例，用代理线条生成
+        handles = [
+            Line2D([], [], color=color, linewidth=2, alpha=0.8, label=code)
+            for code, color in zip(data_dict, colors)
+        ]
         
         ax.set_title('股票收益对比', fontsize=14, fontweight='bold')
-        ax.legend(loc='upper left')
+        ax.legend(handles=handles, loc='upper left')
         ax.grid(True, alpha=0.3)
         ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
         plt.setp(ax.xaxis.get_majorticklabels(), rotation=45)
         
         plt.tight_layout()
         
-        if save_path:
-            plt.savefig(save_path, dpi=150, bbox_inches='tight')
-            print(f"图表已保存至: {save_path}")
-        
-        plt.show()
+        self._finish(fig, save_path, show)
     
+    @_render_rc
     def plot_distribution(
         self,
         df: pd.DataFrame,
         column: str = 'pct_change',
         bins: int = 50,
         title: str = None,
-        save_path: Optional[str] = None
+        save_path: Optional[str] = None,
+        show: bool = True
     ) -> None:
         """
         绘制收益率分布直方图
@@ -355,23 +667,43 @@ class StockVisualizer:
             bins: 直方图柱数
             title: 图表标题
             save_path: 保存路径
+            show: 是否显示窗口，为False时绘制完即关闭图像
         """
+        data = df[column].dropna()
+        if data.empty:
+            print(f"{column} 没有可用数据，跳过分布图")
+            return
+        
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
         
-        data = df[column].dropna()
+        values = data.to_numpy(dtype=np.float64)
+        if NUMBA_AVAILABLE:
+            mean, std, skew, kurt = _moments(values)
+        else:
+            mean, std, skew, kurt = data.mean(), data.std(), data.skew(), data.kurt()
+        # 一次排序得到最小值、四分位数、中位数、最大值
+        v_min, q1, median, q3, v_max = np.percentile(values, [0, 25, 50, 75, 100])
         
         # 直方图
-        ax1.hist(data, bins=bins, alpha=0.7, color='steelblue', edgecolor='black')
-        ax1.axvline(data.mean(), color='red', linestyle='--', linewidth=2, label=f'均值: {data.mean():.2f}')
-        ax1.axvline(data.median(), color='green', linestyle='--', linewidth=2, label=f'中位数: {data.median():.2f}')
+        counts, edges = np.histogram(values, bins=bins)
+        ax1.bar(edges[:-1], counts, width=np.diff(edges), align='edge',
+                alpha=0.7, color='steelblue', edgecolor='black')
+        ax1.axvline(mean, color='red', linestyle='--', linewidth=2, label=f'均值: {mean:.2f}')
+        ax1.axvline(median, color='green', linestyle='--', linewidth=2, label=f'中位数: {median:.2f}')
         ax1.set_xlabel('收益率 (%)')
         ax1.set_ylabel('频数')
         ax1.set_title(title or f'{column} 分布')
         ax1.legend()
         ax1.grid(True, alpha=0.3)
         
-        # 箱线图
-        ax2.boxplot(data, vert=True)
+        # 箱线图：按已算好的分位数直接绘制，须线取1.5倍四分位距内的极值
+        iqr = q3 - q1
+        inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+        ax2.bxp([{
+            'med': median, 'q1': q1, 'q3': q3,
+            'whislo': inside.min(), 'whishi': inside.max(),
+            'fliers': values[(values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)]
+        }])
         ax2.set_ylabel('收益率 (%)')
         ax2.set_title(f'{column} 箱线图')
         ax2.grid(True, alpha=0.3)
@@ -379,29 +711,27 @@ class StockVisualizer:
         # 添加统计信息
         stats_text = f"""
         统计信息:
-        均值: {data.mean():.2f}
-        标准差: {data.std():.2f}
-        最大值: {data.max():.2f}
-        最小值: {data.min():.2f}
-        偏度: {data.skew():.2f}
-        峰度: {data.kurtosis():.2f}
+        均值: {mean:.2f}
+        标准差: {std:.2f}
+        最大值: {v_max:.2f}
+        最小值: {v_min:.2f}
+        偏度: {skew:.2f}
+        峰度: {kurt:.2f}
         """
-        ax2.text(1.1, data.median(), stats_text, verticalalignment='center',
+        ax2.text(1.1, median, stats_text, verticalalignment='center',
                 bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
         
         plt.tight_layout()
         
-        if save_path:
-            plt.savefig(save_path, dpi=150, bbox_inches='tight')
-            print(f"图表已保存至: {save_path}")
-        
-        plt.show()
+        self._finish(fig, save_path, show)
     
+    @_render_rc
     def plot_drawdown(
         self,
         df: pd.DataFrame,
         title: str = "回撤分析",
-        save_path: Optional[str] = None
+        save_path: Optional[str] = None,
+        show: bool = True
     ) -> None:
         """
         绘制回撤分析图
@@ -410,18 +740,38 @@ class StockVisualizer:
             df: 股票数据
             title: 图表标题
             save_path: 保存路径
+            show: 是否显示窗口，为False时绘制完即关闭图像
         """
         # 计算累计收益和回撤
-        cumulative = (1 + df['pct_change'] / 100).cumprod()
-        peak = cumulative.expanding().max()
-        drawdown = (cumulative - peak) / peak * 100
+        if NUMBA_AVAILABLE:
+            cum_arr, dd_arr = _cum_and_drawdown(df['pct_change'].to_numpy(dtype=np.float64))
+            cumulative = pd.Series(cum_arr, index=df.index)
+            drawdown = pd.Series(dd_arr, index=df.index)
+        else:
+            cumulative = (1 + df['pct_change'] / 100).cumprod()
+            peak = cumulative.cummax()
+            drawdown = (cumulative - peak) / peak * 100
+            cum_arr = cumulative.to_numpy(dtype=np.float64)
+        max_drawdown = drawdown.min()
+        
+        # 数据点过多时按桶末抽稀，最大回撤仍取完整数据
+        ends = self._bucket_ends(len(df))
+        cum_arr = self._take(cum_arr, ends)
+        cumulative = self._take(cumulative, ends)
+        drawdown = self._take(drawdown, ends)
+        dates = cumulative.index
         
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 8), sharex=True)
+        dense = len(dates) > self.rasterize_threshold
         
         # 累计收益
-        ax1.plot(df.index, cumulative, label='累计收益', color='blue', linewidth=2)
-        ax1.fill_between(df.index, 1, cumulative, alpha=0.3, 
-                        color=['green' if x >= 1 else 'red' for x in cumulative])
+        ax1.plot(dates, cumulative, label='累计收益', color='blue', linewidth=2,
+                 rasterized=dense)
+        # 盈利区间绿色、亏损区间红色
+        ax1.fill_between(dates, 1, cumulative, where=cum_arr >= 1, interpolate=True,
+                        alpha=0.3, color='green', rasterized=True)
+        ax1.fill_between(dates, 1, cumulative, where=cum_arr < 1, interpolate=True,
+                        alpha=0.3, color='red', rasterized=True)
         ax1.axhline(y=1, color='black', linestyle='--', linewidth=1)
         ax1.set_ylabel('累计收益倍数')
         ax1.set_title(title, fontsize=14, fontweight='bold')
@@ -429,8 +779,8 @@ class StockVisualizer:
         ax1.grid(True, alpha=0.3)
         
         # 回撤
-        ax2.fill_between(df.index, drawdown, 0, alpha=0.5, color='red')
-        ax2.plot(df.index, drawdown, color='darkred', linewidth=2)
+        ax2.fill_between(dates, drawdown, 0, alpha=0.5, color='red', rasterized=True)
+        ax2.plot(dates, drawdown, color='darkred', linewidth=2, rasterized=dense)
         ax2.set_ylabel('回撤 (%)')
         ax2.set_xlabel('日期')
         ax2.grid(True, alpha=0.3)
@@ -440,31 +790,42 @@ class StockVisualizer:
         plt.setp(ax2.xaxis.get_majorticklabels(), rotation=45)
         
         # 添加统计信息
-        max_drawdown = drawdown.min()
         ax2.text(0.02, 0.05, f'最大回撤: {max_drawdown:.2f}%', 
                 transform=ax2.transAxes, fontsize=12,
                 bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.8))
         
         plt.tight_layout()
         
-        if save_path:
-            plt.savefig(save_path, dpi=150, bbox_inches='tight')
-            print(f"图表已保存至: {save_path}")
-        
-        plt.show()
+        self._finish(fig, save_path, show)
+
+
+# 便捷函数共用的可视化器
+_default_visualizer: Optional[StockVisualizer] = None
+
+
+def _get_visualizer() -> StockVisualizer:
+    """获取共用的默认可视化器"""
+    global _default_visualizer
+    if _default_visualizer is None:
+        _default_visualizer = StockVisualizer()
+    return _default_visualizer
 
 
 # 便捷函数
-def plot_stock_analysis(df: pd.DataFrame, title: str = "股票分析") -> None:
+def plot_stock_analysis(
+    df: pd.DataFrame,
+    title: str = "股票分析",
+    analyzer: Optional[TechnicalAnalyzer] = None
+) -> None:
     """
     快速绘制股票分析图的便捷函数
     
     Args:
         df: 股票数据
         title: 图表标题
+        analyzer: 已基于df构建的分析器，可复用其缓存的指标
     """
-    visualizer = StockVisualizer()
-    visualizer.plot_with_indicators(df, title=title)
+    _get_visualizer().plot_with_indicators(df, title=title, analyzer=analyzer)
 
 
 def compare_stocks(data_dict: Dict[str, pd.DataFrame]) -> None:
@@ -474,5 +835,4 @@ def compare_stocks(data_dict: Dict[str, pd.DataFrame]) -> None:
     Args:
         data_dict: 股票代码和数据的字典
     """
-    visualizer = StockVisualizer()
-    visualizer.plot_performance_comparison(data_dict)
\ No newline at end of file
+    _get_visualizer().plot_performance_comparison(data_dict)
\ No newline at end of file
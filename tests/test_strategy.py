@@ -0,0 +1,100 @@
+"""
+选股策略模块测试
+"""
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.strategy import MultiIndicatorStrategy
+
+
+def _score_reference(close: np.ndarray, volume: np.ndarray):
+    """按 pandas 滚动/指数加权逐列计算的综合评分，作为 _score_arrays 的基准"""
+    if len(close) < 60:
+        return None
+    c = pd.Series(close)
+    v = pd.Series(volume)
+    score = 0
+    
+    macd = c.ewm(span=12, adjust=False).mean() - c.ewm(span=26, adjust=False).mean()
+    signal = macd.ewm(span=9, adjust=False).mean()
+    if macd.iloc[-1] > signal.iloc[-1]:
+        score += 25
+        if macd.iloc[-2] <= signal.iloc[-2]:
+            score += 10
+    
+    delta = c.diff()
+    gain = delta.where(delta > 0, 0).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    rsi = (100 - 100 / (1 + gain / loss)).iloc[-1]
+    if 30 <= rsi <= 70:
+        score += 25
+    elif rsi < 30:
+        score += 15
+    
+    middle = c.rolling(20).mean()
+    std = c.rolling(20).std()
+    upper = (middle + std * 2).iloc[-1]
+    lower = (middle - std * 2).iloc[-1]
+    boll_pct = (close[-1] - lower) / (upper - lower)
+    if 0.4 <= boll_pct <= 0.8:
+        score += 25
+    elif boll_pct > 0.8:
+        score += 15
+    
+    vol_ratio = volume[-1] / v.rolling(20).mean().iloc[-1]
+    if vol_ratio > 1.5:
+        score += 25
+    elif vol_ratio > 1.0:
+        score += 15
+    
+    ma5 = c.rolling(5).mean().iloc[-1]
+    ma10 = c.rolling(10).mean().iloc[-1]
+    ma20 = c.rolling(20).mean().iloc[-1]
+    if ma5 > ma10 > ma20:
+        score += 15
+    elif ma5 > ma10:
+        score += 5
+    
+    return score if score >= 60 else None
+
+
+class TestMultiIndicatorScore(unittest.TestCase):
+    """多指标综合评分与 pandas 逐列计算一致"""
+    
+    def setUp(self):
+        self.strategy = MultiIndicatorStrategy(fetcher=object())
+    
+    def _assert_matches(self, close, volume):
+        result = self.strategy._score_arrays(close, volume)
+        expected = _score_reference(close, volume)
+        got = None if result is None else result[0]
+        self.assertEqual(got, expected)
+    
+    def test_flat_series(self):
+        # 停牌股：收盘价不变，布林带宽度为0，不应计分
+        close = np.full(80, 10.07)
+        volume = np.full(80, 12000.0)
+        self._assert_matches(close, volume)
+        
+        # 前段波动、最近20天横盘
+        rng = np.random.default_rng(1)
+        close = np.round(10 + rng.standard_normal(80).cumsum() * 0.05, 2)
+        close[-25:] = close[-26]
+        self._assert_matches(close, rng.integers(1000, 50000, 80).astype(float))
+    
+    def test_random_series(self):
+        rng = np.random.default_rng(0)
+        for _ in range(500):
+            n = int(rng.integers(60, 200))
+            close = np.round(10 + rng.standard_normal(n).cumsum() * 0.05, 2)
+            if rng.random() < 0.3:
+                close[-int(rng.integers(5, 30)):] = close[-1]
+            volume = rng.integers(1000, 50000, n).astype(float)
+            with self.subTest(n=n):
+                self._assert_matches(close, volume)
+
+
+if __name__ == '__main__':
+    unittest.main()
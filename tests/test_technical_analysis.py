@@ -0,0 +1,146 @@
+"""
+技术分析模块测试
+"""
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from src import technical_analysis
+from src.technical_analysis import TechnicalAnalyzer, _tail_macd, _rolling_mean, _rolling_std
+
+
+def _make_df(close, volume) -> pd.DataFrame:
+    close = np.asarray(close, dtype=float)
+    index = pd.date_range('2024-01-01', periods=close.size, freq='B')
+    return pd.DataFrame({
+        'open': close,
+        'high': close,
+        'low': close,
+        'close': close,
+        'volume': np.asarray(volume, dtype=float)
+    }, index=index)
+
+
+def _obv_reference(close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    """逐日递推的OBV：涨加成交量，跌减成交量，持平沿用前值"""
+    obv = np.zeros(close.size)
+    for i in range(1, close.size):
+        if close[i] > close[i - 1]:
+            obv[i] = obv[i - 1] + volume[i]
+        elif close[i] < close[i - 1]:
+            obv[i] = obv[i - 1] - volume[i]
+        else:
+            obv[i] = obv[i - 1]
+    return obv
+
+
+class TestOBV(unittest.TestCase):
+    """能量潮指标"""
+    
+    def test_flat_day_with_missing_volume_keeps_previous_value(self):
+        df = _make_df(
+            [10.00, 10.05, 10.04, 10.04, 10.10],
+            [1000, 20000, 73190, np.nan, 5000]
+        )
+        obv = TechnicalAnalyzer(df).obv().to_numpy()
+        np.testing.assert_array_equal(obv, [0, 20000, -53190, -53190, -48190])
+    
+    def test_missing_close_counts_as_flat(self):
+        df = _make_df([10.0, np.nan, 10.2, 10.1], [100, 200, 300, 400])
+        obv = TechnicalAnalyzer(df).obv().to_numpy()
+        np.testing.assert_array_equal(obv, _obv_reference(df['close'].to_numpy(), df['volume'].to_numpy()))
+    
+    def test_matches_daily_recursion(self):
+        rng = np.random.default_rng(0)
+        close = np.round(10 + rng.standard_normal(300).cumsum() * 0.05, 2)
+        volume = rng.integers(1000, 100000, 300).astype(float)
+        volume[rng.integers(0, 300, 10)] = np.nan
+        # 缺失成交量只放在持平日，否则递推结果本身就会变为NaN
+        volume[np.isnan(volume) & (np.diff(close, prepend=close[0]) != 0)] = 1.0
+        obv = TechnicalAnalyzer(_make_df(close, volume)).obv().to_numpy()
+        np.testing.assert_array_equal(obv, _obv_reference(close, volume))
+
+
+class TestNumbaFallback(unittest.TestCase):
+    """未安装numba时的回退实现与加速内核结果一致"""
+    
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        close = np.round(10 + rng.standard_normal(120).cumsum() * 0.05, 2)
+        close[40:52] = close[39]
+        self.df = _make_df(close, rng.integers(1000, 50000, 120))
+        self.df['high'] = self.df['close'] + 0.05
+        self.df['low'] = self.df['close'] - 0.05
+        self.df.iloc[40:52, self.df.columns.get_loc('high')] = close[39]
+        self.df.iloc[40:52, self.df.columns.get_loc('low')] = close[39]
+    
+    def _both(self, func):
+        fast = func()
+        with mock.patch.object(technical_analysis, 'NUMBA_AVAILABLE', False):
+            slow = func()
+        return fast, slow
+    
+    def test_kdj(self):
+        fast, slow = self._both(lambda: TechnicalAnalyzer(self.df).kdj())
+        pd.testing.assert_frame_equal(fast, slow)
+        # 横盘窗口RSV缺失，其后K值均为NaN
+        self.assertTrue(np.isnan(fast['K'].iloc[-1]))
+    
+    def test_tail_macd(self):
+        close = self.df['close'].to_numpy()
+        fast, slow = self._both(lambda: _tail_macd(close))
+        np.testing.assert_array_equal(fast, slow)
+
+
+class TestRollingKernels(unittest.TestCase):
+    """滚动均值/标准差与 pandas rolling 逐位一致（含缺失值、横盘和短序列）"""
+    
+    def _series_cases(self):
+        rng = np.random.default_rng(3)
+        prices = np.round(10 + rng.standard_normal(200).cumsum() * 0.05, 2)
+        with_nan = prices.copy()
+        with_nan[[0, 17, 18, 90]] = np.nan
+        flat = prices.copy()
+        flat[50:90] = flat[49]
+        volume = rng.integers(1000, 100000, 200).astype(float)
+        return {
+            'prices': prices,
+            'with_nan': with_nan,
+            'flat': flat,
+            'constant': np.full(40, 10.07),
+            'volume': volume,
+            'short': prices[:3],
+            'empty': prices[:0],
+        }
+    
+    def test_matches_pandas(self):
+        for name, values in self._series_cases().items():
+            for window in (1, 2, 5, 14, 20, 60):
+                expected_mean = pd.Series(values).rolling(window).mean().to_numpy()
+                expected_std = pd.Series(values).rolling(window).std().to_numpy()
+                with self.subTest(series=name, window=window):
+                    np.testing.assert_array_equal(_rolling_mean(values, window), expected_mean)
+                    np.testing.assert_array_equal(_rolling_std(values, window), expected_std)
+    
+    def test_flat_window_is_exact(self):
+        values = np.full(30, 10.07)
+        self.assertTrue((_rolling_mean(values, 20)[19:] == 10.07).all())
+        self.assertTrue((_rolling_std(values, 20)[19:] == 0.0).all())
+    
+    def test_fused_signals_match_pandas_path(self):
+        rng = np.random.default_rng(4)
+        close = np.round(10 + rng.standard_normal(150).cumsum() * 0.05, 2)
+        close[60:85] = close[59]
+        df = _make_df(close, rng.integers(1000, 50000, 150))
+        df['high'] = df['close'] + 0.03
+        df['low'] = df['close'] - 0.03
+        fused = TechnicalAnalyzer(df).generate_signals()
+        with mock.patch.object(technical_analysis, 'NUMBA_AVAILABLE', False):
+            fallback = TechnicalAnalyzer(df).generate_signals()
+        pd.testing.assert_frame_equal(fused, fallback)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,4 @@
+import os
 from src.baostock_fetcher import BaoStockDataFetcher
 
 print("重新获取股票列表（过滤掉退市股票）...")
@@ -9,6 +10,10 @@ print(f"  总股票数: {len(stocks)}")
 print(f"  状态分布:")
 print(stocks['status'].value_counts())
 
+# 调试时设置 VERBOSE=1 查看列表样例，最多格式化20行，避免整表转字符串
+if os.getenv('VERBOSE'):
+    print(stocks.to_string(max_rows=20))
+
 # 保存到缓存
 from src.cache import StockDataCache
 cache = StockDataCache()